@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from ti4_map_generator import benchmark
+
+
+def test_run_benchmarks():
+    results = benchmark.run_benchmarks(runs=10)
+
+    for name in (
+        "catalog_load.p50",
+        "prepare_slices.p99",
+        "generate_slices.throughput",
+        "rebalance.iterations.max",
+        "place_tiles.mean",
+    ):
+        assert name in results
+
+
+def test_compare_results():
+    baseline = {"prepare_slices.p50": 1.0, "generate_slices.throughput": 100}
+
+    assert benchmark.compare_results(
+        {"prepare_slices.p50": 1.1, "generate_slices.throughput": 90},
+        baseline,
+    ) == []
+    regressions = benchmark.compare_results(
+        {"prepare_slices.p50": 1.5, "generate_slices.throughput": 50},
+        baseline,
+    )
+    assert len(regressions) == 2
+
+
+def test_compare_zero_baseline():
+    baseline = {"rebalance.restarts.p50": 0}
+
+    assert benchmark.compare_results(
+        {"rebalance.restarts.p50": 1}, baseline
+    ) == []
+    assert benchmark.compare_results(
+        {"rebalance.restarts.p50": 40}, baseline
+    ) == ["rebalance.restarts.p50: 40 (baseline 0)"]
+    # Metrics missing from the baseline are not compared
+    assert benchmark.compare_results({"place_tiles.p50": 40}, baseline) == []
+
+
+def test_main_flags_regressions(tmp_path, monkeypatch):
+    baseline = tmp_path / "baseline.json"
+    monkeypatch.setattr(
+        benchmark, "run_benchmarks",
+        lambda runs, seed: {"prepare_slices.p50": 2.0},
+    )
+
+    benchmark.main(["--baseline", str(baseline), "--save"])
+    assert json.loads(baseline.read_text()) == {"prepare_slices.p50": 2.0}
+    benchmark.main(["--baseline", str(baseline)])
+
+    baseline.write_text(json.dumps({"prepare_slices.p50": 1.0}))
+    with pytest.raises(SystemExit):
+        benchmark.main(["--baseline", str(baseline)])
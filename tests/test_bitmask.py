@@ -0,0 +1,53 @@
+import random
+
+from ti4_map_generator import bitmask
+from ti4_map_generator import map_generation
+
+
+def random_slice_sets(tiles, count):
+    rng = random.Random(0)
+    return [
+        map_generation.generate_slices(
+            map_generation.draw_all_tiles(list(tiles), rng=rng), rng=rng
+        )
+        for _ in range(count)
+    ]
+
+
+def test_encode_decode():
+    tiles = map_generation.load_tiles()
+    catalog = bitmask.BitmaskCatalog(tiles)
+
+    for slices in random_slice_sets(tiles, 50):
+        masks = catalog.encode(slices)
+        assert bitmask.is_partition(masks)
+        assert catalog.unpack(catalog.pack(masks)) == masks
+        assert len(catalog.pack(masks)) == 6 * 4
+
+        decoded = catalog.decode(masks)
+        assert catalog.encode(decoded) == masks
+        assert catalog.encode(list(reversed(slices))) == masks
+
+
+def test_aggregates():
+    tiles = map_generation.load_tiles()
+    catalog = bitmask.BitmaskCatalog(tiles)
+
+    for slices in random_slice_sets(tiles, 200):
+        masks = [catalog.encode_slice(s) for s in slices]
+        assert catalog.is_balanced(masks) \
+            == map_generation.check_slice_balance(slices)
+        for mask, slice_ in zip(masks, slices):
+            assert catalog.aggregates(mask) == (
+                slice_.resources,
+                slice_.influence,
+                slice_.absolute_value,
+                sum(slice_.technology.values()),
+                *(slice_.wormholes[w] for w in bitmask.WORMHOLE_TYPES),
+            )
+
+
+def test_overlaps():
+    assert bitmask.overlaps(0b0110, 0b0100)
+    assert not bitmask.overlaps(0b0110, 0b1001)
+    assert not bitmask.is_partition((0b0110, 0b0011))
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import pytest
+
+from ti4_map_generator import catalog
+from ti4_map_generator import map_generation
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config"
+    shutil.copytree(map_generation.CONFIG_PATH, path)
+    catalog.clear_cache()
+    yield path
+    catalog.clear_cache()
+
+
+def test_catalog_is_cached(config_path):
+    first = catalog.get_catalog(config_path)
+    assert catalog.get_catalog(config_path) is first
+    assert len(first.tiles) == 31
+
+
+def test_catalog_ignores_touched_files(config_path):
+    first = catalog.get_catalog(config_path)
+    tiles_file = config_path / "tiles.json"
+    stat = tiles_file.stat()
+    os.utime(tiles_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert catalog.get_catalog(config_path) is first
+
+
+def test_catalog_reloads_changed_config(config_path):
+    first = catalog.get_catalog(config_path)
+    planets_file = config_path / "planets.csv"
+    planets_file.write_text(
+        planets_file.read_text().replace("Wellon,1,2,Y,I", "Wellon,4,2,Y,I")
+    )
+
+    second = catalog.get_catalog(config_path)
+    assert second is not first
+    wellon = [t for t in second.tiles if t.id_ == 19][0]
+    assert wellon.resources == 4
+
+
+def test_catalog_snapshot(config_path, tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "catalog.pickle"
+    catalog.get_catalog(config_path, snapshot_path)
+    assert snapshot_path.exists()
+
+    catalog.clear_cache()
+
+    def fail(config_path):
+        raise AssertionError("Config should not be parsed")
+
+    monkeypatch.setattr(catalog, "load_tiles", fail)
+    loaded = catalog.get_catalog(config_path, snapshot_path)
+    assert len(loaded.tiles) == 31
+
+
+def test_catalog_snapshot_from_environment(config_path, tmp_path,
+                                           monkeypatch):
+    snapshot_path = tmp_path / "catalog.pickle"
+    monkeypatch.setenv(catalog.SNAPSHOT_ENV, str(snapshot_path))
+    catalog.get_catalog(config_path)
+    assert snapshot_path.exists()
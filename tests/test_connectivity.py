@@ -0,0 +1,83 @@
+from ti4_map_generator import connectivity
+from ti4_map_generator import galaxy
+from ti4_map_generator.catalog import get_catalog
+from ti4_map_generator import geometry
+
+
+def wormhole_hexes(graph):
+    return {
+        idx for idx, tile in enumerate(graph.tiles)
+        if tile is not None and tile.wormholes
+    }
+
+
+def test_wormhole_links():
+    result = galaxy.generate_galaxy(seed=4)
+    graph = connectivity.WormholeGraph.from_galaxy(result)
+
+    edges = 0
+    for wormhole, endpoints in graph.endpoints.items():
+        assert endpoints == {
+            idx for idx, tile in enumerate(result.tiles)
+            if tile is not None and wormhole in tile.wormholes
+        }
+        edges += len(endpoints) * (len(endpoints) - 1) // 2
+        for a in endpoints:
+            for b in endpoints - {a}:
+                assert b in set(graph.neighbours(a))
+                assert graph.steps_from(a)[b] == 1
+    assert graph.wormhole_edges() == edges > 0
+    assert graph.is_connected()
+
+
+def test_swap_updates_links():
+    result = galaxy.generate_galaxy(seed=5)
+    graph = connectivity.WormholeGraph.from_galaxy(result)
+    wormhole = next(iter(wormhole_hexes(graph)))
+    plain = next(
+        idx for idx, tile in enumerate(graph.tiles)
+        if tile is not None and not tile.wormholes
+        and idx != galaxy.CENTER
+    )
+
+    graph.swap(wormhole, plain)
+    rebuilt = connectivity.WormholeGraph(graph.tiles, graph.layout)
+    assert graph.endpoints == rebuilt.endpoints
+    assert graph.impassable == rebuilt.impassable
+    assert wormhole_hexes(graph) == wormhole_hexes(rebuilt)
+    for source in result.homes:
+        assert graph.steps_from(source) == rebuilt.steps_from(source)
+
+    graph.swap(wormhole, plain)
+    assert graph.endpoints == connectivity.WormholeGraph.from_galaxy(
+        result
+    ).endpoints
+
+
+def test_reachability():
+    layout = geometry.get_layout("galaxy")
+    graph = connectivity.WormholeGraph([None] * len(layout), layout)
+
+    assert graph.reachable(galaxy.CENTER, 1) == 6
+    assert graph.reachable(galaxy.CENTER, 3) == 36
+    assert graph.is_connected()
+
+
+def test_blocking_hexes_stop_movement():
+    layout = geometry.get_layout("galaxy")
+    nebula = next(t for t in get_catalog().tiles if t.id_ == 42)
+    graph = connectivity.WormholeGraph([None] * len(layout), layout)
+    # A ring 3 corner only has 3 neighbours
+    corner = layout.ring_indices[3][0]
+    for neighbour in layout.neighbours[corner]:
+        graph.set_tile(neighbour, nebula)
+
+    assert corner not in graph.steps_from(galaxy.CENTER)
+    assert not graph.is_connected()
+    # Ships can still leave the nebula they start in
+    assert set(graph.steps_from(layout.neighbours[corner][0])) \
+        == set(range(len(layout)))
+
+    graph.set_tile(layout.neighbours[corner][0], None)
+    assert graph.blocking == set(layout.neighbours[corner][1:])
+    assert graph.is_connected()
@@ -0,0 +1,75 @@
+import random
+
+from ti4_map_generator import dedup
+from ti4_map_generator import map_generation
+from ti4_map_generator import parallel
+
+
+def shuffled(slices, rng):
+    # Same slice set, with tiles and slices in another order
+    slices = [
+        map_generation.Slice(rng.sample(slice_.tiles, len(slice_.tiles)))
+        for slice_ in slices
+    ]
+    rng.shuffle(slices)
+    return slices
+
+
+def test_hash_ignores_order():
+    rng = random.Random(0)
+    slices = map_generation.prepare_slices(seed=1)
+    other = map_generation.prepare_slices(seed=2)
+
+    assert dedup.canonical_form(slices) \
+        == dedup.canonical_form(shuffled(slices, rng))
+    assert dedup.slice_set_hash(slices) \
+        == dedup.slice_set_hash(shuffled(slices, rng))
+    assert dedup.slice_set_hash(slices) != dedup.slice_set_hash(other)
+    assert 0 <= dedup.slice_set_hash(slices) < 2 ** 64
+
+
+def test_seen_set_persistence(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / "seen.bin"
+    slices = map_generation.prepare_slices(seed=1)
+
+    with dedup.SeenSet(path) as seen:
+        assert seen.add(slices)
+        assert not seen.add(shuffled(slices, rng))
+        assert slices in seen
+
+    reloaded = dedup.SeenSet(path)
+    assert len(reloaded) == 1
+    assert not reloaded.add(slices)
+
+
+def test_bloom_filter(tmp_path):
+    path = tmp_path / "seen.bloom"
+    slice_sets = list(map_generation.iter_slice_sets(20, seed=3))
+
+    with dedup.BloomFilter(capacity=1000, path=path) as seen:
+        for slices in slice_sets:
+            assert seen.add(slices)
+        assert not seen.add(slice_sets[0])
+
+    reloaded = dedup.BloomFilter(capacity=1000, path=path)
+    assert len(reloaded) == 20
+    assert all(slices in reloaded for slices in slice_sets)
+
+
+def test_generation_skips_seen():
+    seen = dedup.SeenSet()
+    first = list(map_generation.iter_slice_sets(5, seed=4, seen=seen))
+    # The same seed only gives duplicates at first, which are skipped
+    second = list(map_generation.iter_slice_sets(5, seed=4, seen=seen))
+
+    assert len(first) == len(second) == 5
+    assert len(seen) == 10
+    hashes = {dedup.slice_set_hash(s) for s in first + second}
+    assert len(hashes) == 10
+
+    in_parallel = list(parallel.iter_parallel_slice_sets(
+        5, seed=4, workers=2, seen=dedup.SeenSet()
+    ))
+    assert [dedup.slice_set_hash(s) for s in in_parallel] \
+        == [dedup.slice_set_hash(s) for s in first]
@@ -0,0 +1,33 @@
+from ti4_map_generator import exact
+from ti4_map_generator import map_generation
+
+
+def test_best_slice_sets():
+    tiles = map_generation.draw_all_tiles(map_generation.load_tiles())
+    results = exact.best_slice_sets(tiles, top=3)
+
+    assert len(results) == 3
+    scores = [exact.set_score(slices) for slices in results]
+    assert scores == sorted(scores)
+    for slices in results:
+        assert map_generation.check_slice_balance(slices)
+        assert sorted(t.id_ for s in slices for t in s.tiles) \
+            == sorted(t.id_ for t in tiles)
+
+
+def test_prepare_slices_exact():
+    slices = map_generation.prepare_slices(engine='exact')
+    assert map_generation.check_slice_balance(slices)
+
+
+def test_node_budget_is_deterministic():
+    tiles = map_generation.draw_all_tiles(map_generation.load_tiles())
+
+    def search():
+        search = exact.BranchAndBound(tiles, top=3, max_nodes=200)
+        results = search.run()
+        assert not search.complete
+        assert search.nodes == 200
+        return [[t.id_ for s in slices for t in s.tiles] for slices in results]
+
+    assert search() == search()
@@ -0,0 +1,73 @@
+import json
+import random
+import statistics
+
+import pytest
+
+from ti4_map_generator import fairness
+from ti4_map_generator import map_generation
+
+
+def test_running_stats_merge():
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(100)]
+
+    first, second = fairness.RunningStats(), fairness.RunningStats()
+    for value in values[:30]:
+        first.add(value)
+    for value in values[30:]:
+        second.add(value)
+    first.merge(second)
+
+    assert first.count == 100
+    assert abs(first.mean - statistics.fmean(values)) < 1e-9
+    assert abs(first.variance - statistics.variance(values)) < 1e-9
+    assert first.min == min(values) and first.max == max(values)
+
+
+def test_histogram():
+    histogram = fairness.Histogram(0, 1, 4)
+    for value in (-1, 0, 0.3, 0.5, 1, 2):
+        histogram.add(value)
+
+    assert histogram.counts == [1, 1, 1, 1]
+    assert histogram.underflow == histogram.overflow == 1
+    assert histogram.edges() == [0, 0.25, 0.5, 0.75, 1]
+
+
+def test_analyze():
+    result = fairness.analyze(20, seed=1, workers=2, chunk_size=3)
+    serial = fairness.FairnessStats()
+    for slices in map_generation.iter_slice_sets(20, seed=1):
+        serial.add(slices)
+
+    assert result.runs == 20
+    assert result.best == serial.best
+    assert result.worst == serial.worst
+    stats = result.stats["value_ratio"]
+    assert 1 <= stats.min <= stats.max < 1.5
+    assert abs(stats.mean - serial.stats["value_ratio"].mean) < 1e-9
+    assert sum(result.histograms["value_ratio"].counts) == 20
+    # 5 tiles in both the best and the worst slice of every set
+    assert sum(result.best.values()) == sum(result.worst.values()) == 100
+
+
+def test_main_json(capsys):
+    fairness.main(["--runs", "5", "--seed", "2", "--workers", "1", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["runs"] == 5
+    assert set(report["metrics"]) == set(fairness.METRICS)
+
+
+def test_add_scores_matches_add():
+    scoring = pytest.importorskip("ti4_map_generator.scoring")
+    tiles = map_generation.load_tiles()
+    slice_sets = list(map_generation.iter_slice_sets(30, seed=3))
+
+    serial = fairness.FairnessStats()
+    for slices in slice_sets:
+        serial.add(slices)
+    batch = fairness.FairnessStats()
+    batch.add_scores(slice_sets, scoring.score_slice_sets(tiles, slice_sets))
+
+    assert batch.to_dict() == serial.to_dict()
@@ -0,0 +1,97 @@
+from collections import Counter
+
+import pytest
+
+from ti4_map_generator import galaxy
+from ti4_map_generator import geometry
+from ti4_map_generator import map_generation
+from ti4_map_generator import placement
+
+
+def test_layout():
+    layout = galaxy.LAYOUT
+
+    assert len(layout) == 37
+    assert [len(layout.ring_indices[k]) for k in range(4)] == [1, 6, 12, 18]
+    assert len(layout.neighbours[galaxy.CENTER]) == 6
+    for idx, neighbours in enumerate(layout.neighbours):
+        for neighbour in neighbours:
+            assert geometry.distance(
+                layout.coordinates[idx], layout.coordinates[neighbour]
+            ) == 1
+            assert idx in layout.neighbours[neighbour]
+
+
+def test_seat_hexes():
+    assert all(galaxy.LAYOUT.rings[home] == 3 for home in galaxy.HOMES)
+
+    # Every hex but Mecatol Rex belongs to exactly one seat
+    slots = Counter(
+        hex_idx
+        for hexes in galaxy.SEAT_HEXES
+        for slot, hex_idx in enumerate(hexes)
+        if slot == galaxy.HOME_SLOT or slot in placement.POSITIONS
+    )
+    assert set(slots) == set(range(len(galaxy.LAYOUT))) - {galaxy.CENTER}
+    assert set(slots.values()) == {1}
+
+    # The hex flower of each seat matches the galaxy geometry
+    for hexes in galaxy.SEAT_HEXES:
+        for slot, neighbours in enumerate(placement.NEIGHBOURS):
+            for neighbour in neighbours:
+                assert hexes[neighbour] in \
+                    galaxy.LAYOUT.neighbours[hexes[slot]]
+
+
+def test_generate_galaxy():
+    result = galaxy.generate_galaxy(seed=7)
+
+    assert galaxy.validate_galaxy(result) == []
+    assert result.tiles[galaxy.CENTER].id_ == galaxy.MECATOL_REX_ID
+    assert result.tiles[galaxy.CENTER].resources == 1
+    assert len(result.map_string().split()) == 36
+    assert galaxy.generate_galaxy(seed=7).map_string() \
+        == result.map_string()
+    assert sum(tile["home"] for tile in result.to_dict()["tiles"]) == 6
+
+
+def test_validate_galaxy():
+    result = galaxy.generate_galaxy(seed=1)
+    duplicate = next(t for t in result.tiles[1:] if t is not None)
+    result.tiles[result.homes[0]] = duplicate
+    result.tiles[result.homes[1] - 1] = None
+
+    assert len(galaxy.validate_galaxy(result)) == 3
+
+
+def test_build_galaxy_players():
+    slices = map_generation.prepare_slices(seed=1, players=4)
+    with pytest.raises(ValueError):
+        galaxy.build_galaxy(slices)
+
+
+def test_seat_values():
+    result = galaxy.generate_galaxy(seed=2)
+    values = galaxy.seat_values(result)
+
+    assert len(values) == 6
+    assert all(value > 0 for value in values)
+    home = result.homes[0]
+    assert values[0] == sum(
+        tile.absolute_value
+        * galaxy.DISTANCE_WEIGHTS[result.layout.distances[home][idx]]
+        for idx, tile in enumerate(result.tiles)
+        if tile and result.layout.distances[home][idx] <= 3
+    )
+
+
+def test_validate_unreachable():
+    result = galaxy.generate_galaxy(seed=1)
+    supernova = next(t for t in result.tiles if t and t.id_ == 43)
+    # A corner hex of ring 3 only has 3 neighbours
+    corner = galaxy.LAYOUT.ring_indices[3][0]
+    for neighbour in galaxy.LAYOUT.neighbours[corner]:
+        result.tiles[neighbour] = supernova
+
+    assert "Some systems cannot be reached" in \
+        galaxy.validate_galaxy(result)
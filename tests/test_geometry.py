@@ -0,0 +1,42 @@
+import pytest
+
+from ti4_map_generator import geometry
+from ti4_map_generator import placement
+
+
+def test_ring():
+    assert geometry.ring(geometry.ORIGIN, 0) == [geometry.ORIGIN]
+    for radius in (1, 2, 3):
+        hexes = geometry.ring(geometry.ORIGIN, radius)
+        assert len(set(hexes)) == 6 * radius
+        assert {geometry.distance(h, geometry.ORIGIN) for h in hexes} \
+            == {radius}
+        # Walking around the ring, each hex is next to the previous one
+        for a, b in zip(hexes, hexes[1:] + hexes[:1]):
+            assert geometry.distance(a, b) == 1
+
+
+def test_distances():
+    layout = geometry.get_layout("galaxy")
+
+    assert geometry.get_layout("galaxy") is layout
+    assert max(max(row) for row in layout.distances) == 6
+    for i, row in enumerate(layout.distances):
+        assert row[i] == 0
+        assert [j for j, d in enumerate(row) if d == 1] \
+            == sorted(layout.neighbours[i])
+        for j, d in enumerate(row):
+            assert layout.distances[j][i] == d
+
+
+def test_slice_layout():
+    # Slots around the centre are next to the previous and next slot
+    for slot in range(1, placement.SLOTS):
+        assert placement.NEIGHBOURS[slot] == frozenset(
+            {placement.CENTER, slot % 6 + 1, (slot - 2) % 6 + 1}
+        )
+
+
+def test_unknown_layout():
+    with pytest.raises(ValueError):
+        geometry.get_layout("hyperlanes")
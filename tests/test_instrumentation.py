@@ -0,0 +1,36 @@
+import pytest
+
+from ti4_map_generator import catalog
+from ti4_map_generator import map_generation
+
+
+def test_prepare_slices_with_stats():
+    catalog.clear_cache()
+    metrics = []
+    slices, stats = map_generation.prepare_slices_with_stats(
+        hooks=[lambda name, value: metrics.append((name, value))], seed=1,
+    )
+
+    assert map_generation.check_slice_balance(slices)
+    for stage in (
+        "load_catalog", "parse_config", "build_tiles", "draw_all_tiles",
+        "generate_slices", "rebalance", "balance", "place_tiles",
+    ):
+        assert stats.timings[stage] >= 0
+        assert f"time.{stage}" in {name for name, _ in metrics}
+
+    moves = stats.counters["moves.best_worst_swap"] \
+        + stats.counters["moves.res_inf_swap"]
+    assert moves >= stats.counters["iterations"]
+    assert ("count.iterations", stats.counters["iterations"]) in metrics
+    assert stats.report.iterations == stats.counters["iterations"]
+    assert stats.report.restarts == stats.counters["restarts"]
+
+
+@pytest.mark.parametrize("engine", map_generation.ENGINES)
+def test_engines_are_instrumented(engine):
+    slices, stats = map_generation.prepare_slices_with_stats(
+        engine=engine, seed=1,
+    )
+    assert stats.timings["draw_all_tiles"] > 0
+    assert stats.timings["balance"] >= stats.timings["draw_all_tiles"]
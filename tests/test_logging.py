@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import multiprocessing
+
+import pytest
+
+from ti4_map_generator import logging as ti4_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def root():
+    yield logging.getLogger(ti4_logging.ROOT_LOGGER)
+    ti4_logging.configure()
+
+
+def test_handler_attached_once(root):
+    for _ in range(3):
+        ti4_logging.get_logger("ti4_map_generator.test")
+    ti4_logging.configure()
+    assert len(root.handlers) == 1
+
+
+def test_level_from_environment(root, monkeypatch):
+    monkeypatch.setenv(ti4_logging.LEVEL_ENV, "warning")
+    ti4_logging.configure()
+    assert root.level == logging.WARNING
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_configure(root, queued):
+    target = ListHandler()
+    ti4_logging.configure("DEBUG", queued=queued, target=target)
+
+    logger = ti4_logging.get_logger("ti4_map_generator.test")
+    logger.debug("Rebalancing")
+    logger.info("Done")
+    # Stopping the listener flushes the queue
+    ti4_logging.configure("INFO", queued=False, target=ListHandler())
+
+    assert [r.getMessage() for r in target.records] \
+        == ["Rebalancing", "Done"]
+    assert len(root.handlers) == 1
+
+
+def log_in_worker(message):
+    ti4_logging.get_logger("ti4_map_generator.test").info(message)
+    return len(logging.getLogger(ti4_logging.ROOT_LOGGER).handlers)
+
+
+def test_queued_in_forked_worker(root, tmp_path):
+    path = tmp_path / "worker.log"
+    target = logging.FileHandler(path)
+    ti4_logging.configure("INFO", queued=True, target=target)
+
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        assert pool.submit(log_in_worker, "From the worker").result() == 1
+    target.close()
+
+    assert path.read_text().splitlines() == ["From the worker"]
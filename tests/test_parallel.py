@@ -0,0 +1,30 @@
+from ti4_map_generator import map_generation
+from ti4_map_generator import parallel
+
+
+def slice_sets_ids(slice_sets):
+    return [
+        [[t.id_ if t else None for t in s.tiles] for s in slices]
+        for slices in slice_sets
+    ]
+
+
+def test_parallel_generation_is_deterministic():
+    first = list(parallel.iter_parallel_slice_sets(
+        20, seed=42, workers=1, chunk_size=3
+    ))
+    second = list(parallel.iter_parallel_slice_sets(
+        20, seed=42, workers=2, chunk_size=5
+    ))
+
+    assert len(first) == 20
+    assert slice_sets_ids(first) == slice_sets_ids(second)
+    for slices in first:
+        assert map_generation.check_slice_balance(slices)
+
+
+def test_parallel_generation_matches_serial():
+    serial = map_generation.iter_slice_sets(5, seed=3)
+    assert slice_sets_ids(serial) == slice_sets_ids(
+        parallel.iter_parallel_slice_sets(5, seed=3, workers=2)
+    )
@@ -0,0 +1,74 @@
+import random
+
+from ti4_map_generator import map_generation
+from ti4_map_generator import placement
+
+
+def tiles_by_id(*ids):
+    tiles = {t.id_: t for t in map_generation.load_tiles()}
+    return [tiles[id_] for id_ in ids]
+
+
+def test_neighbours():
+    for slot, neighbours in enumerate(placement.NEIGHBOURS):
+        assert slot not in neighbours
+        for neighbour in neighbours:
+            assert slot in placement.NEIGHBOURS[neighbour]
+    assert placement.NEIGHBOURS[5] == {0, 4, 6}
+
+
+def test_place_tiles_rules():
+    # Supernova and Nebula, plus both blue wormhole tiles
+    slice_tiles = tiles_by_id(43, 42, 25, 26, 19)
+
+    for seed in range(20):
+        result = placement.place_tiles(slice_tiles, random.Random(seed))
+        assert sorted(t.id_ for t in result if t) \
+            == sorted(t.id_ for t in slice_tiles)
+        assert [bool(t) for t in result] \
+            == [slot in placement.POSITIONS for slot in range(7)]
+        assert not placement.is_anomaly(result[placement.CENTER])
+
+        for a, b in placement.ADJACENT_PAIRS:
+            tile_a = result[placement.POSITIONS[a]]
+            tile_b = result[placement.POSITIONS[b]]
+            assert not (
+                placement.is_anomaly(tile_a) and placement.is_anomaly(tile_b)
+            )
+            assert not (tile_a.wormholes and tile_b.wormholes)
+
+
+def test_place_tiles_without_valid_placement():
+    # Four wormholes cannot be kept apart around the centre slot
+    slice_tiles = tiles_by_id(39, 40, 25, 26, 19)
+    result = placement.place_tiles(slice_tiles)
+    assert sorted(t.id_ for t in result if t) \
+        == sorted(t.id_ for t in slice_tiles)
+
+
+def test_placement_cache():
+    cache = placement.PlacementCache(maxsize=2)
+    patterns = [
+        tuple(placement.tile_pattern(t) for t in tiles_by_id(*ids))
+        for ids in ((43, 42, 25, 26, 19), (46, 47, 20, 21, 23),
+                    (39, 41, 24, 27, 28))
+    ]
+
+    first = cache.get(patterns[0])
+    assert cache.get(patterns[0]) is first
+    assert first == placement.best_placements(patterns[0])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get(patterns[1])
+    cache.get(patterns[2])
+    assert len(cache) == 2
+    cache.get(patterns[0])
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_place_tiles_uses_cache():
+    placement.CACHE.clear()
+    for _ in range(3):
+        placement.place_tiles(tiles_by_id(43, 42, 25, 26, 19))
+        placement.place_tiles(tiles_by_id(26, 19, 42, 25, 43))
+    assert (placement.CACHE.hits, placement.CACHE.misses) == (5, 1)
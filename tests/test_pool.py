@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ti4_map_generator import map_generation
+from ti4_map_generator import parallel
+from ti4_map_generator import pool
+
+
+def make_pool(**kwargs):
+    return pool.SlicePool(
+        executor=ThreadPoolExecutor(2, initializer=parallel.init_worker),
+        **kwargs,
+    )
+
+
+def test_pool_refills():
+    slice_pool = make_pool(size=20, low_water=10, seed=1)
+    slice_pool.start()
+    try:
+        assert slice_pool.wait_full(timeout=30)
+        assert len(slice_pool) == 20
+
+        for _ in range(15):
+            assert map_generation.check_slice_balance(slice_pool.get())
+        assert slice_pool.wait_full(timeout=30)
+    finally:
+        slice_pool.stop()
+
+    assert slice_pool.stats.hits == 15
+    assert slice_pool.stats.hit_rate == 1
+    assert slice_pool.stats.refilled >= 35
+    assert slice_pool.stats.refill_throughput > 0
+
+
+def test_pool_miss():
+    slice_pool = make_pool(size=5, low_water=1)
+    # Not started, nothing is ready
+    assert map_generation.check_slice_balance(slice_pool.get())
+    assert slice_pool.stats.misses == 1
+    assert slice_pool.stats.hit_rate == 0
+
+
+def test_pool_persistence(tmp_path):
+    path = tmp_path / "pool.jsonl"
+    slice_pool = make_pool(size=10, low_water=5, path=path)
+    slice_pool.start()
+    slice_pool.wait_full(timeout=30)
+    slice_pool.stop()
+    assert len(path.read_text().splitlines()) == 10
+
+    reloaded = make_pool(size=10, low_water=5, path=path)
+    reloaded.start()
+    try:
+        assert len(reloaded) >= 10
+        assert map_generation.check_slice_balance(reloaded.get())
+    finally:
+        reloaded.stop()
+
+
+def test_pool_survives_failed_chunks(monkeypatch):
+    calls = []
+
+    def flaky_chunk(engine, seeds):
+        calls.append(seeds)
+        if len(calls) == 1:
+            raise RuntimeError("Worker failed")
+        return parallel.generate_chunk(engine, seeds)
+
+    monkeypatch.setattr(pool, "generate_chunk", flaky_chunk)
+    slice_pool = make_pool(size=20, low_water=10, seed=1)
+    slice_pool.start()
+    try:
+        assert slice_pool.wait_full(timeout=30)
+    finally:
+        slice_pool.stop()
+
+    assert slice_pool.stats.failed_chunks == 1
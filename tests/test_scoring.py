@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from ti4_map_generator import map_generation
+
+np = pytest.importorskip("numpy")
+scoring = pytest.importorskip("ti4_map_generator.scoring")
+
+
+def test_score_slice_sets_matches_slices():
+    tiles = map_generation.load_tiles()
+    rng = random.Random(0)
+    slice_sets = [
+        map_generation.generate_slices(
+            map_generation.draw_all_tiles(list(tiles), rng=rng), rng=rng
+        )
+        for _ in range(200)
+    ]
+    scores = scoring.score_slice_sets(tiles, slice_sets)
+
+    assert scores.balanced.shape == (200,)
+    for i, slices in enumerate(slice_sets):
+        assert scores.balanced[i] == \
+            map_generation.check_slice_balance(slices)
+        for j, slice_ in enumerate(slices):
+            assert scores.resources[i, j] == slice_.resources
+            assert scores.influence[i, j] == slice_.influence
+            assert scores.absolute_value[i, j] == slice_.absolute_value
+            assert scores.technology[i, j] == \
+                sum(slice_.technology.values())
+            assert list(scores.wormholes[i, j]) == \
+                [slice_.wormholes[w] for w in scoring.WORMHOLE_TYPES]
+
+
+def test_random_partitions_composition():
+    tiles = map_generation.draw_all_tiles(map_generation.load_tiles())
+    arrays = scoring.TileArrays(tiles)
+    partitions = scoring.random_partitions(
+        arrays, 50, np.random.default_rng(0)
+    )
+
+    assert partitions.shape == (50, 6, 5)
+    for partition in partitions:
+        assert sorted(partition.flatten()) == list(range(len(tiles)))
+        for row in partition:
+            colors = sorted(tiles[idx].color for idx in row)
+            assert colors == ['blue'] * 3 + ['red'] * 2
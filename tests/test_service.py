@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+from ti4_map_generator import parallel
+from ti4_map_generator import service
+
+
+async def get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, body = response.split(b"\r\n\r\n", 1)
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def run_service(*targets):
+    async def run():
+        executor = ThreadPoolExecutor(2, initializer=parallel.init_worker)
+        slice_service = service.SliceService(executor=executor)
+        server = await slice_service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(*(get(port, t) for t in targets))
+        finally:
+            server.close()
+            await server.wait_closed()
+            slice_service.close()
+
+    return asyncio.run(run())
+
+
+def test_slices():
+    (status, body), (_, again), (annealed_status, _) = run_service(
+        "/slices?seed=12", "/slices?seed=12", "/slices?engine=annealing"
+    )
+
+    assert status == 200
+    assert body["seed"] == 12
+    assert len(body["slices"]) == 6
+    assert body == again
+    assert annealed_status == 200
+
+
+def test_player_count():
+    (status, body), = run_service("/slices?seed=5&players=8")
+
+    assert status == 200
+    assert len(body["slices"]) == 8
+
+
+def test_thresholds():
+    (status, body), = run_service("/slices?seed=3&max_ratio=1.2")
+
+    assert status == 200
+    values = [s["absolute_value"] for s in body["slices"]]
+    assert max(values) / min(values) <= 1.2
+
+
+def test_errors():
+    responses = run_service(
+        "/unknown", "/slices?players=9", "/slices?seed=abc",
+        "/slices?engine=magic", "/slices?max_ratio=1.0", "/health",
+    )
+    assert [status for status, _ in responses] == [
+        404, 400, 400, 400, 422, 200,
+    ]
@@ -0,0 +1,35 @@
+from math import comb
+import random
+
+from ti4_map_generator import map_generation
+from ti4_map_generator import slice_table
+
+
+def test_slice_table():
+    tiles = map_generation.load_tiles()
+    table = slice_table.get_slice_table(tiles)
+
+    assert slice_table.get_slice_table(tiles) is table
+    assert len(table) == comb(12, 2) * comb(19, 3)
+    assert list(table.absolute_value) == sorted(table.absolute_value)
+
+    band = table.band(15, 17)
+    assert all(15 <= table.absolute_value[i] <= 17 for i in band)
+    assert table.absolute_value[band.start - 1] < 15
+    assert table.absolute_value[band.stop] > 17
+
+
+def test_select():
+    tiles = map_generation.load_tiles()
+    table = slice_table.get_slice_table(tiles)
+
+    for seed in range(20):
+        rng = random.Random(seed)
+        drawn = map_generation.draw_all_tiles(list(tiles), rng=rng)
+        slices, nodes = table.select(drawn, rng=rng)
+
+        assert map_generation.check_slice_balance(slices)
+        assert sorted(t.id_ for s in slices for t in s.tiles) \
+            == sorted(t.id_ for t in drawn)
+        for slice_ in slices:
+            assert len(list(slice_.filter_tiles(color='red'))) == 2
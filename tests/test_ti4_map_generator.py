@@ -1,5 +1,176 @@
-from ti4_map_generator import __version__
+import json
+
+import pytest
+
+from ti4_map_generator import (
+    __version__,
+    generate_slices,
+    write_slices_jsonl,
+)
+from ti4_map_generator import catalog, map_generation
 
 
 def test_version():
     assert __version__ == '0.1.0'
+
+
+@pytest.fixture
+def tiles():
+    return map_generation.load_tiles()
+
+
+def test_balance_slices(tiles):
+    slices, report = map_generation.balance_slices(tiles)
+    assert map_generation.check_slice_balance(slices)
+    assert len(slices) == 6
+    assert report.iterations >= 0 and report.restarts >= 0
+
+
+def test_balance_slices_gives_up(tiles, monkeypatch):
+    monkeypatch.setattr(
+        map_generation, 'check_slice_balance', lambda slices: False
+    )
+    with pytest.raises(map_generation.RebalanceError):
+        map_generation.balance_slices(tiles, max_restarts=3)
+
+
+def test_prepare_slices_annealing():
+    slices = map_generation.prepare_slices(engine='annealing')
+    assert map_generation.check_slice_balance(slices)
+    for slice_ in slices:
+        assert len(list(slice_.filter_tiles(color='red'))) == 2
+        assert len(list(slice_.filter_tiles(color='blue'))) == 3
+
+
+@pytest.mark.parametrize("players", map_generation.PLAYER_COUNTS)
+def test_draw_all_tiles_players(tiles, players):
+    blue, red = map_generation.slice_composition(players)
+    drawn = map_generation.draw_all_tiles(list(tiles), players)
+
+    assert sum(t.color == 'blue' for t in drawn) == players * blue
+    assert sum(t.color == 'red' for t in drawn) == players * red
+    assert len({t.id_ for t in drawn}) == len(drawn)
+
+
+@pytest.mark.parametrize("engine", ["rebalance", "annealing", "table"])
+@pytest.mark.parametrize("players", map_generation.PLAYER_COUNTS)
+def test_prepare_slices_players(engine, players):
+    blue, red = map_generation.slice_composition(players)
+    slices = map_generation.prepare_slices(
+        engine=engine, seed=players, players=players
+    )
+
+    assert len(slices) == players
+    assert map_generation.check_slice_balance(slices)
+    for slice_ in slices:
+        assert len(list(slice_.filter_tiles(color='red'))) == red
+        assert len(list(slice_.filter_tiles(color='blue'))) == blue
+
+
+def test_unsupported_player_count(tiles):
+    for players in (2, 9):
+        with pytest.raises(ValueError):
+            map_generation.draw_all_tiles(list(tiles), players)
+
+
+def test_generation_is_quiet(caplog):
+    generate_slices(["--count", "3", "--log-level", "INFO"])
+    assert caplog.records == []
+
+
+def test_prepare_slices_unknown_engine():
+    with pytest.raises(ValueError):
+        map_generation.prepare_slices(engine='unknown')
+
+
+def test_slice_incremental_values(tiles):
+    slice_ = map_generation.Slice(tiles[:5])
+    slice_.swap(0, tiles[5])
+    slice_.add(tiles[6])
+    slice_.pop(1)
+    slice_.remove_best_tile()
+    slice_.remove_excessive_tile()
+
+    expected = map_generation.Slice(list(slice_.tiles))
+    assert slice_.resources == expected.resources
+    assert slice_.influence == expected.influence
+    assert slice_.absolute_value == expected.absolute_value
+    assert slice_.technology == expected.technology
+    assert slice_.wormholes == expected.wormholes
+
+
+def test_iter_slice_sets(tiles):
+    slice_sets = map_generation.iter_slice_sets(tiles=tiles)
+    for _ in range(3):
+        assert map_generation.check_slice_balance(next(slice_sets))
+
+
+def test_generate_slices_jsonl(capsys):
+    generate_slices(["--count", "3"])
+    lines = capsys.readouterr().out.splitlines()
+
+    assert len(lines) == 3
+    for idx, line in enumerate(lines):
+        record = json.loads(line)
+        assert record["index"] == idx
+        assert len(record["slices"]) == 6
+        for slice_ in record["slices"]:
+            assert len([t for t in slice_["tiles"] if t]) == 5
+
+
+def test_jsonl_records_are_flushed(tiles):
+    events = []
+
+    class Output:
+        def write(self, text):
+            events.append("write")
+
+        def flush(self):
+            events.append("flush")
+
+    def slice_sets():
+        for _ in range(2):
+            # The previous record is out before the next one is generated
+            assert events[-1:] in ([], ["flush"])
+            yield map_generation.prepare_slices(tiles=tiles)
+
+    write_slices_jsonl(slice_sets(), Output())
+    assert events == ["write", "flush"] * 2
+
+
+@pytest.mark.parametrize("argv", [
+    ["--players", "4"], ["--count", "3"], ["--workers", "2"],
+])
+def test_galaxy_rejects_slice_options(argv, capsys):
+    with pytest.raises(SystemExit):
+        generate_slices(["--galaxy", *argv])
+    assert "--galaxy" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("engine", map_generation.ENGINES)
+def test_prepare_slices_seed(tiles, engine):
+    def tile_ids(slices):
+        return [[t.id_ if t else None for t in s.tiles] for s in slices]
+
+    first = map_generation.prepare_slices(engine=engine, tiles=tiles, seed=7)
+    second = map_generation.prepare_slices(engine=engine, tiles=tiles, seed=7)
+    assert tile_ids(first) == tile_ids(second)
+
+
+def test_catalog_snapshot_option(tmp_path, monkeypatch, capsys):
+    snapshot_path = tmp_path / "catalog.pickle"
+    monkeypatch.setenv(catalog.SNAPSHOT_ENV, "")
+    catalog.clear_cache()
+    try:
+        generate_slices(["--count", "1", "--catalog-snapshot",
+                         str(snapshot_path)])
+    finally:
+        catalog.clear_cache()
+    assert snapshot_path.exists()
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+
+def test_sampling_requires_numpy(monkeypatch):
+    monkeypatch.setattr(map_generation, "HAS_NUMPY", False)
+    with pytest.raises(ValueError, match="numpy extra"):
+        map_generation.get_engine('sampling')
@@ -0,0 +1,68 @@
+import math
+
+import pytest
+
+from ti4_map_generator import galaxy
+from ti4_map_generator.catalog import get_catalog
+from ti4_map_generator import geometry
+from ti4_map_generator import travel
+
+SLICE = geometry.get_layout("slice")
+OPEN = (travel.OPEN, "")
+
+
+def costs_from(source, **hexes):
+    # Open slice layout, but for the given slots
+    terrain = [OPEN] * len(SLICE)
+    for slot, hex_terrain in hexes.items():
+        terrain[int(slot[1:])] = hex_terrain
+    return travel.travel_costs(SLICE, tuple(terrain), source)
+
+
+def test_open_terrain_is_distance():
+    layout = geometry.get_layout("galaxy")
+    terrain = (OPEN,) * len(layout)
+    for source in (0, 7, 36):
+        assert list(travel.travel_costs(layout, terrain, source)) \
+            == list(layout.distances[source])
+
+
+def test_movement_rules():
+    # From slot 1, slot 4 is reached through the centre
+    assert costs_from(1)[4] == 2
+    assert costs_from(1, s0=(travel.IMPASSABLE, ""))[0] == math.inf
+    # Around the centre instead of through it, but it can be reached
+    blocked = costs_from(1, s0=(travel.BLOCKING, ""))
+    assert blocked[4] == 3 and blocked[0] == 1
+    assert costs_from(1, s0=(travel.RIFT, ""))[4] \
+        == 1 + travel.RIFT_EXIT_COST
+    assert costs_from(1, s1=(travel.OPEN, "A"), s4=(travel.OPEN, "A"))[4] \
+        == 1
+    assert costs_from(1, s1=(travel.OPEN, "A"), s4=(travel.OPEN, "B"))[4] \
+        == 2
+
+
+def test_tile_terrain():
+    tiles = {t.id_: t for t in get_catalog().tiles}
+    assert travel.tile_terrain(tiles[43]) == (travel.IMPASSABLE, "")
+    assert travel.tile_terrain(tiles[42]) == (travel.BLOCKING, "")
+    assert travel.tile_terrain(tiles[41]) == (travel.RIFT, "")
+    assert travel.tile_terrain(tiles[39]) == (travel.OPEN, "A")
+    assert travel.tile_terrain(None) == OPEN
+
+
+def test_travel_weight():
+    assert travel.travel_weight(0.5) == 1
+    assert travel.travel_weight(2) == galaxy.DISTANCE_WEIGHTS[2]
+    assert travel.travel_weight(math.inf) == 0
+
+
+def test_travel_seat_values():
+    result = galaxy.generate_galaxy(seed=3)
+    values = galaxy.seat_values(result, 'travel')
+
+    assert len(values) == 6
+    assert all(value > 0 for value in values)
+    assert galaxy.seat_values(result, 'travel') == values
+    with pytest.raises(ValueError):
+        galaxy.seat_values(result, 'flight')
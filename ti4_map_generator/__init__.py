@@ -1,6 +1,12 @@
 __version__ = '0.1.0'
 
-from . import map_generation
+import argparse
+import json
+import os
+import pathlib
+import sys
+
+from . import logging, map_generation
 
 
 def print_slices(slices):
@@ -13,10 +19,115 @@ def print_slices(slices):
         print(f"Absolute value : {slice_.absolute_value}")
         print(f"Total ressource: {slice_.resources}")
         print(f"Total influence: {slice_.influence}")
-        print(f"Tech skips: {slice_.technology}")
-        print(f"Wormholes: {slice_.wormholes}")
+        print("Tech skips: {}".format(
+            "".join(sorted(slice_.technology.elements()))
+        ))
+        print("Wormholes: {}".format(
+            "".join(sorted(slice_.wormholes.elements()))
+        ))
+
+
+def write_slices_jsonl(slice_sets, output=None):
+    output = output or sys.stdout
+    for idx, slices in enumerate(slice_sets):
+        output.write(json.dumps({
+            "index": idx,
+            "slices": [slice_.to_dict() for slice_ in slices],
+        }) + "\n")
+        # A piped stdout is block buffered, readers would only see records
+        # in bursts
+        output.flush()
+
+
+def generate_slices(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate balanced slices of tiles"
+    )
+    parser.add_argument(
+        "--count", type=int,
+        help="Generate COUNT slice sets, written as JSON Lines",
+    )
+    parser.add_argument(
+        "--engine", choices=map_generation.ENGINES, default="rebalance",
+        help="Algorithm used to balance the slices",
+    )
+    parser.add_argument(
+        "--players", type=int, choices=map_generation.PLAYER_COUNTS,
+        default=6,
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        help="Generate slice sets over WORKERS processes",
+    )
+    parser.add_argument(
+        "--seed", type=int,
+        help="Seed of the generation, the same seed gives the same slices",
+    )
+    parser.add_argument(
+        "--galaxy", action="store_true",
+        help="Print a full 6 player galaxy map instead of slices",
+    )
+    parser.add_argument(
+        "--seen", type=pathlib.Path,
+        help="Skip slice sets recorded in SEEN, and record the new ones",
+    )
+    parser.add_argument(
+        "--catalog-snapshot", type=pathlib.Path,
+        help="Load the tile catalog from this trusted pickle, written on "
+             "first use",
+    )
+    parser.add_argument(
+        "--log-level",
+        help=f"Logging level, defaults to ${logging.LEVEL_ENV} or "
+             f"{logging.DEFAULT_LEVEL}",
+    )
+    parser.add_argument(
+        "--log-queue", action="store_true", default=None,
+        help="Write logs from a background thread",
+    )
+    args = parser.parse_args(argv)
+    if args.galaxy:
+        from .galaxy import SEATS
+        if args.players != SEATS:
+            parser.error(f"--galaxy maps are for {SEATS} players")
+        for option in ("count", "workers", "seen"):
+            if getattr(args, option) is not None:
+                parser.error(f"--galaxy cannot be used with --{option}")
+    logging.configure(args.log_level, args.log_queue)
+    if args.catalog_snapshot:
+        # Through the environment, so worker processes use it too
+        from .catalog import SNAPSHOT_ENV
+        os.environ[SNAPSHOT_ENV] = str(args.catalog_snapshot)
+
+    if args.galaxy:
+        from .galaxy import generate_galaxy
+        print(generate_galaxy(engine=args.engine, seed=args.seed).map_string())
+        return
+
+    if args.count is None:
+        print_slices(map_generation.prepare_slices(
+            engine=args.engine, seed=args.seed, players=args.players
+        ))
+        return
 
+    seen = None
+    if args.seen:
+        from .dedup import SeenSet
+        seen = SeenSet(args.seen)
 
-def generate_slices():
-    slices = map_generation.prepare_slices()
-    print_slices(slices)
+    if args.workers:
+        from .parallel import iter_parallel_slice_sets
+        slice_sets = iter_parallel_slice_sets(
+            args.count, engine=args.engine, seed=args.seed,
+            workers=args.workers, seen=seen, players=args.players,
+        )
+    else:
+        slice_sets = map_generation.iter_slice_sets(
+            args.count, engine=args.engine, seed=args.seed, seen=seen,
+            players=args.players,
+        )
+    try:
+        write_slices_jsonl(slice_sets)
+    finally:
+        if seen is not None:
+            seen.close()
@@ -0,0 +1,115 @@
+import math
+import random
+
+from . import logging
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import (
+    RebalanceError,
+    RebalanceReport,
+    Slice,
+    Tile,
+    check_slice_balance,
+    draw_all_tiles,
+    generate_slices,
+)
+
+LOG = logging.get_logger(__name__)
+
+MAX_MOVES = 5000
+START_TEMPERATURE = 2.0
+END_TEMPERATURE = 0.01
+
+
+def slice_unbalance(slice_: Slice) -> float:
+    # Values come in half points, so this is positive exactly when
+    # Slice.is_slice_unbalanced() is true
+    excess = max(slice_.resources, slice_.influence) \
+        - 2 * min(slice_.resources, slice_.influence)
+    return max(0, excess + 0.5)
+
+
+def slices_cost(slices: list[Slice]) -> float:
+    values = [slice_.absolute_value for slice_ in slices]
+    # Values come in half points, so this is positive exactly when the 1.5
+    # ratio enforced by check_slice_balance() is not met
+    cost = max(0, max(values) - 1.5 * min(values) + 0.25)
+    cost += max(values) - min(values)
+    cost += 2 * sum(slice_unbalance(slice_) for slice_ in slices)
+    return cost
+
+
+def swap_tiles(slice_a: Slice, idx_a: int, slice_b: Slice, idx_b: int):
+    slice_b.swap(idx_b, slice_a.swap(idx_a, slice_b.tiles[idx_b]))
+
+
+def random_swap(
+    slices: list[Slice], rng: random.Random
+) -> tuple[Slice, int, Slice, int]:
+    # Only swap tiles of the same color so every slice keeps its composition
+    slice_a, slice_b = rng.sample(slices, 2)
+    idx_a = rng.randrange(len(slice_a.tiles))
+    color = slice_a.tiles[idx_a].color
+    idx_b = rng.choice([
+        idx for idx, tile in enumerate(slice_b.tiles) if tile.color == color
+    ])
+    return slice_a, idx_a, slice_b, idx_b
+
+
+def anneal(
+    slices: list[Slice],
+    max_moves: int = MAX_MOVES,
+    start_temperature: float = START_TEMPERATURE,
+    end_temperature: float = END_TEMPERATURE,
+    rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], int]:
+    rng = rng or random
+    cost = slices_cost(slices)
+    cooling = (end_temperature / start_temperature) ** (1 / max_moves)
+    temperature = start_temperature
+
+    for move in range(max_moves):
+        if check_slice_balance(slices):
+            return slices, move
+
+        swap = random_swap(slices, rng)
+        swap_tiles(*swap)
+        new_cost = slices_cost(slices)
+        delta = new_cost - cost
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            cost = new_cost
+            instrumentation.count("moves.accepted")
+        else:
+            # Swapping the same tiles back restores the previous state
+            swap_tiles(*swap)
+            instrumentation.count("moves.rejected")
+        temperature *= cooling
+
+    return slices, max_moves
+
+
+def anneal_slices(
+    tiles: list[Tile],
+    players: int = 6,
+    max_moves: int = MAX_MOVES,
+    rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], RebalanceReport]:
+    with instrumentation.stage("draw_all_tiles"):
+        drawn = draw_all_tiles(list(tiles), players, rng=rng)
+    with instrumentation.stage("generate_slices"):
+        slices = generate_slices(drawn, players, rng=rng)
+    with instrumentation.stage("anneal"):
+        slices, moves = anneal(
+            slices, max_moves=max_moves, rng=rng,
+            instrumentation=instrumentation,
+        )
+    report = RebalanceReport(iterations=moves)
+
+    if not check_slice_balance(slices):
+        raise RebalanceError(
+            f"Could not balance slices after {moves} annealing moves"
+        )
+
+    LOG.debug("Annealing balanced slices in %d moves", moves)
+    return slices, report
@@ -0,0 +1,150 @@
+import argparse
+import json
+import pathlib
+import random
+import statistics
+import sys
+import time
+
+from .catalog import TileCatalog
+from .map_generation import (
+    CONFIG_PATH,
+    PLAYER_COUNTS,
+    balance_slices,
+    draw_all_tiles,
+    generate_slices,
+    prepare_slices,
+)
+
+RUNS = 500
+MARGIN = 0.2
+# Allowed increase of a metric whose baseline is 0, where a relative margin
+# would not allow any, such as restarts going from none to one
+ZERO_TOLERANCE = 1
+# Every other metric is better when lower
+HIGHER_IS_BETTER = {"generate_slices.throughput"}
+
+
+def distribution(name: str, samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    return {
+        f"{name}.mean": statistics.fmean(samples),
+        f"{name}.p50": percentile(0.5),
+        f"{name}.p90": percentile(0.9),
+        f"{name}.p99": percentile(0.99),
+        f"{name}.max": samples[-1],
+    }
+
+
+def timed(func, *args, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_benchmarks(runs: int = RUNS, seed: int = 0,
+                   config_path: pathlib.Path = CONFIG_PATH) -> dict:
+    results = {}
+    seeds = random.Random(seed)
+    catalog = TileCatalog.from_config(config_path)
+    tiles = catalog.tiles
+
+    results.update(distribution("catalog_load", [
+        timed(TileCatalog.from_config, config_path)[0]
+        for _ in range(max(1, runs // 10))
+    ]))
+
+    results.update(distribution("prepare_slices", [
+        timed(prepare_slices, tiles=tiles, seed=seeds.getrandbits(64))[0]
+        for _ in range(runs)
+    ]))
+    for players in PLAYER_COUNTS:
+        results.update(distribution(f"prepare_slices.{players}p", [
+            timed(prepare_slices, tiles=tiles, seed=seeds.getrandbits(64),
+                  players=players)[0]
+            for _ in range(max(1, runs // 10))
+        ]))
+
+    rng = random.Random(seeds.getrandbits(64))
+    elapsed = sum(
+        timed(generate_slices, draw_all_tiles(list(tiles), rng=rng),
+              rng=rng)[0]
+        for _ in range(runs)
+    )
+    results["generate_slices.throughput"] = runs / elapsed
+
+    iterations, restarts, placements = [], [], []
+    for _ in range(runs):
+        rng = random.Random(seeds.getrandbits(64))
+        slices, report = balance_slices(tiles, rng=rng)
+        iterations.append(report.iterations)
+        restarts.append(report.restarts)
+        for slice_ in slices:
+            placements.append(timed(slice_.place_tiles, rng=rng)[0])
+    results.update(distribution("rebalance.iterations", iterations))
+    results.update(distribution("rebalance.restarts", restarts))
+    results.update(distribution("place_tiles", placements))
+
+    return results
+
+
+def compare_results(results: dict, baseline: dict,
+                    margin: float = MARGIN) -> list[str]:
+    regressions = []
+    for name, value in sorted(results.items()):
+        if name not in baseline:
+            continue
+        reference = baseline[name]
+        if name in HIGHER_IS_BETTER:
+            regressed = value < reference * (1 - margin)
+        elif not reference:
+            regressed = value > ZERO_TOLERANCE
+        else:
+            regressed = value > reference * (1 + margin)
+        if regressed:
+            regressions.append(
+                f"{name}: {value:.6g} (baseline {reference:.6g})"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the slice generation pipeline"
+    )
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--baseline", type=pathlib.Path,
+        default=pathlib.Path("benchmark_baseline.json"),
+    )
+    parser.add_argument(
+        "--save", action="store_true",
+        help="Store the results as the new baseline",
+    )
+    parser.add_argument(
+        "--margin", type=float, default=MARGIN,
+        help="Allowed slowdown over the baseline, as a fraction",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.runs, args.seed)
+    for name, value in sorted(results.items()):
+        print(f"{name:32} {value:.6g}")
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=4) + "\n")
+        return
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_results(results, baseline, args.margin)
+        if regressions:
+            print("Regressions over the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
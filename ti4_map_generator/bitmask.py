@@ -0,0 +1,102 @@
+from .map_generation import Slice, Tile, WORMHOLE_TYPES
+
+# Aggregates of a mask: resources, influence, absolute value, tech skips,
+# then one wormhole count per type
+RESOURCES, INFLUENCE, ABSOLUTE_VALUE, TECHNOLOGY, WORMHOLES = range(5)
+
+
+class BitmaskCatalog:
+    # A slice is an int with bit i set when it holds the catalog's i-th tile,
+    # a slice set is the sorted tuple of its slices. Only the composition of
+    # slices is encoded, not where tiles are placed.
+    def __init__(self, tiles: list[Tile]):
+        self.tiles = list(tiles)
+        self.index = {tile.id_: idx for idx, tile in enumerate(self.tiles)}
+        self.mask_bytes = (len(self.tiles) + 7) // 8
+
+        values = [
+            (
+                tile.resources,
+                tile.influence,
+                tile.absolute_value,
+                len(tile.technology),
+                *(tile.wormholes.count(w) for w in WORMHOLE_TYPES),
+            )
+            for tile in self.tiles
+        ]
+        width = 4 + len(WORMHOLE_TYPES)
+
+        # Sums for every possible byte of a mask, so aggregating a slice
+        # takes one lookup per byte instead of one per tile
+        self._tables = []
+        for offset in range(0, len(self.tiles), 8):
+            table = [(0,) * width]
+            for tile_values in values[offset:offset + 8]:
+                table += [
+                    tuple(a + b for a, b in zip(entry, tile_values))
+                    for entry in table
+                ]
+            self._tables.append(table + [(0,) * width] * (256 - len(table)))
+
+    def encode_slice(self, slice_: Slice) -> int:
+        mask = 0
+        for tile in slice_.filter_tiles():
+            mask |= 1 << self.index[tile.id_]
+        return mask
+
+    def decode_slice(self, mask: int) -> Slice:
+        return Slice([
+            tile for idx, tile in enumerate(self.tiles) if mask >> idx & 1
+        ])
+
+    def encode(self, slices: list[Slice]) -> tuple[int, ...]:
+        return tuple(sorted(self.encode_slice(slice_) for slice_ in slices))
+
+    def decode(self, masks: tuple[int, ...]) -> list[Slice]:
+        return [self.decode_slice(mask) for mask in masks]
+
+    def aggregates(self, mask: int) -> tuple:
+        result = self._tables[0][mask & 0xFF]
+        for table in self._tables[1:]:
+            mask >>= 8
+            result = tuple(
+                a + b for a, b in zip(result, table[mask & 0xFF])
+            )
+        return result
+
+    def is_balanced(self, masks: tuple[int, ...]) -> bool:
+        # Same checks as check_slice_balance()
+        aggregates = [self.aggregates(mask) for mask in masks]
+        values = [a[ABSOLUTE_VALUE] for a in aggregates]
+        if max(values) >= 1.5 * min(values):
+            return False
+        for a in aggregates:
+            if a[RESOURCES] >= 2 * a[INFLUENCE] \
+                    or a[INFLUENCE] >= 2 * a[RESOURCES]:
+                return False
+        return True
+
+    def pack(self, masks: tuple[int, ...]) -> bytes:
+        return b"".join(
+            mask.to_bytes(self.mask_bytes, "little") for mask in masks
+        )
+
+    def unpack(self, data: bytes) -> tuple[int, ...]:
+        return tuple(
+            int.from_bytes(data[i:i + self.mask_bytes], "little")
+            for i in range(0, len(data), self.mask_bytes)
+        )
+
+
+def overlaps(mask_a: int, mask_b: int) -> bool:
+    return bool(mask_a & mask_b)
+
+
+def is_partition(masks: tuple[int, ...]) -> bool:
+    # True when no tile is used by two slices
+    union = 0
+    for mask in masks:
+        if union & mask:
+            return False
+        union |= mask
+    return True
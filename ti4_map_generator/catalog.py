@@ -0,0 +1,123 @@
+import hashlib
+import os
+import pathlib
+import pickle
+import threading
+
+from . import logging
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import CONFIG_PATH, Tile, load_tiles
+
+LOG = logging.get_logger(__name__)
+
+CONFIG_FILES = ("tiles.json", "planets.csv")
+SNAPSHOT_VERSION = 1
+# Snapshot used when get_catalog is not given one, which is how worker
+# processes find it
+SNAPSHOT_ENV = "TI4_CATALOG_SNAPSHOT"
+
+
+def config_stats(config_path: pathlib.Path) -> dict[str, tuple[int, int]]:
+    stats = {}
+    for name in CONFIG_FILES:
+        stat = config_path.joinpath(name).stat()
+        stats[name] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def config_digest(config_path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    for name in CONFIG_FILES:
+        digest.update(config_path.joinpath(name).read_bytes())
+    return digest.hexdigest()
+
+
+class TileCatalog:
+    def __init__(self, config_path: pathlib.Path, tiles: list[Tile],
+                 stats: dict, digest: str):
+        self.config_path = config_path
+        self.tiles = tiles
+        self.stats = stats
+        self.digest = digest
+
+    @classmethod
+    def from_config(cls, config_path: pathlib.Path = CONFIG_PATH,
+                    instrumentation=NULL_INSTRUMENTATION):
+        stats = config_stats(config_path)
+        digest = config_digest(config_path)
+        tiles = load_tiles(config_path, instrumentation)
+        return cls(config_path, tiles, stats, digest)
+
+    def is_stale(self) -> bool:
+        stats = config_stats(self.config_path)
+        if stats == self.stats:
+            return False
+
+        # Files were touched, only rebuild if their content changed
+        if config_digest(self.config_path) != self.digest:
+            return True
+        self.stats = stats
+        return False
+
+    def save(self, snapshot_path: pathlib.Path):
+        with open(snapshot_path, "wb") as f:
+            pickle.dump({
+                "version": SNAPSHOT_VERSION,
+                "stats": self.stats,
+                "digest": self.digest,
+                "tiles": self.tiles,
+            }, f)
+
+    @classmethod
+    def load(cls, snapshot_path: pathlib.Path,
+             config_path: pathlib.Path = CONFIG_PATH):
+        # Returns None if there is no usable snapshot for this config
+        try:
+            with open(snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        catalog = cls(config_path, snapshot["tiles"], snapshot["stats"],
+                      snapshot["digest"])
+        if catalog.is_stale():
+            return None
+        return catalog
+
+
+_catalogs: dict[pathlib.Path, TileCatalog] = {}
+_lock = threading.Lock()
+
+
+def get_catalog(config_path: pathlib.Path = CONFIG_PATH,
+                snapshot_path: pathlib.Path = None,
+                instrumentation=NULL_INSTRUMENTATION) -> TileCatalog:
+    # The snapshot, from snapshot_path or $TI4_CATALOG_SNAPSHOT, saves
+    # parsing the config. It is a pickle, loading it can run arbitrary code:
+    # only point it to a file written by a trusted process.
+    if snapshot_path is None and os.environ.get(SNAPSHOT_ENV):
+        snapshot_path = pathlib.Path(os.environ[SNAPSHOT_ENV])
+    key = pathlib.Path(config_path).resolve()
+    with _lock:
+        catalog = _catalogs.get(key)
+        if catalog and not catalog.is_stale():
+            return catalog
+
+        catalog = None
+        if snapshot_path:
+            catalog = TileCatalog.load(snapshot_path, config_path)
+        if catalog is None:
+            LOG.debug("Building tile catalog from %s", config_path)
+            catalog = TileCatalog.from_config(config_path, instrumentation)
+            if snapshot_path:
+                catalog.save(snapshot_path)
+
+        _catalogs[key] = catalog
+        return catalog
+
+
+def clear_cache():
+    with _lock:
+        _catalogs.clear()
@@ -0,0 +1,102 @@
+from collections import deque
+
+from .geometry import HexLayout
+from .map_generation import WORMHOLE_TYPES
+from .travel import BLOCKING, IMPASSABLE, tile_terrain
+
+
+class WormholeGraph:
+    # Adjacency of a map once wormholes are taken into account: hexes are
+    # linked to their neighbours in the layout and to every other hex with
+    # the same wormhole. Only wormhole endpoints are stored, so moving tiles
+    # around updates the graph in constant time.
+    def __init__(self, tiles: list, layout: HexLayout):
+        self.tiles = list(tiles)
+        self.layout = layout
+        self.endpoints = {wormhole: set() for wormhole in WORMHOLE_TYPES}
+        # Hexes ships cannot move into, and hexes they cannot move through
+        self.impassable = set()
+        self.blocking = set()
+        for idx, tile in enumerate(self.tiles):
+            self._add(idx, tile)
+
+    @classmethod
+    def from_galaxy(cls, galaxy) -> 'WormholeGraph':
+        return cls(galaxy.tiles, galaxy.layout)
+
+    def _add(self, idx: int, tile):
+        rule, wormholes = tile_terrain(tile)
+        for wormhole in wormholes:
+            self.endpoints[wormhole].add(idx)
+        if rule == IMPASSABLE:
+            self.impassable.add(idx)
+        elif rule == BLOCKING:
+            self.blocking.add(idx)
+
+    def _remove(self, idx: int, tile):
+        rule, wormholes = tile_terrain(tile)
+        for wormhole in wormholes:
+            self.endpoints[wormhole].discard(idx)
+        self.impassable.discard(idx)
+        self.blocking.discard(idx)
+
+    def set_tile(self, idx: int, tile):
+        self._remove(idx, self.tiles[idx])
+        self.tiles[idx] = tile
+        self._add(idx, tile)
+
+    def swap(self, i: int, j: int):
+        tile_i, tile_j = self.tiles[i], self.tiles[j]
+        self._remove(i, tile_i)
+        self._remove(j, tile_j)
+        self.tiles[i], self.tiles[j] = tile_j, tile_i
+        self._add(i, tile_j)
+        self._add(j, tile_i)
+
+    def neighbours(self, idx: int):
+        yield from self.layout.neighbours[idx]
+        for wormhole in tile_terrain(self.tiles[idx])[1]:
+            for other in self.endpoints[wormhole]:
+                if other != idx:
+                    yield other
+
+    def wormhole_edges(self) -> int:
+        # Links added by wormholes, on top of the layout's adjacent pairs
+        return sum(
+            len(endpoints) * (len(endpoints) - 1) // 2
+            for endpoints in self.endpoints.values()
+        )
+
+    def steps_from(self, source: int) -> dict[int, int]:
+        # Fewest moves from source to every hex ships can reach. As in
+        # travel.travel_costs, ships stop in blocking hexes unless they
+        # start there.
+        steps = {source: 0}
+        queue = deque([source])
+        while queue:
+            idx = queue.popleft()
+            if idx in self.blocking and idx != source:
+                continue
+            for neighbour in self.neighbours(idx):
+                if neighbour not in steps \
+                        and neighbour not in self.impassable:
+                    steps[neighbour] = steps[idx] + 1
+                    queue.append(neighbour)
+        return steps
+
+    def reachable(self, source: int, max_steps: int) -> int:
+        # Hexes at most max_steps moves away from source, source excluded
+        return sum(
+            0 < steps <= max_steps
+            for steps in self.steps_from(source).values()
+        )
+
+    def is_connected(self) -> bool:
+        # Every hex ships can move into is reachable from every other one
+        passable = [
+            idx for idx in range(len(self.layout))
+            if idx not in self.impassable
+        ]
+        if not passable:
+            return True
+        return len(self.steps_from(passable[0])) == len(passable)
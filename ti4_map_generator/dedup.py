@@ -0,0 +1,149 @@
+from array import array
+import hashlib
+import math
+import pathlib
+
+from . import logging
+from .map_generation import Slice
+
+LOG = logging.get_logger(__name__)
+
+HASH_BYTES = 8
+# Ends every slice in the hashed form, no tile has this id
+SEPARATOR = 0xFFFF
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 1e-6
+
+
+def canonical_form(slices: list[Slice]) -> tuple[tuple[int, ...], ...]:
+    # Neither the order of tiles within slices nor the order of slices
+    # matters, nor where tiles are placed
+    return tuple(sorted(
+        tuple(sorted(tile.id_ for tile in slice_.filter_tiles()))
+        for slice_ in slices
+    ))
+
+
+def slice_set_hash(slices: list[Slice]) -> int:
+    # 64 bit hash of the canonical form, stable across runs and processes
+    ids = array('H')
+    for slice_ids in canonical_form(slices):
+        ids.extend(slice_ids)
+        ids.append(SEPARATOR)
+    return int.from_bytes(
+        hashlib.blake2b(ids.tobytes(), digest_size=HASH_BYTES).digest(),
+        "little",
+    )
+
+
+class SeenSet:
+    # Exact set of the slice set hashes seen so far. With a path, new hashes
+    # are appended to it as they are added, so nothing is lost on a crash.
+    def __init__(self, path: pathlib.Path = None):
+        self.path = path
+        self.hashes = set()
+        self._file = None
+
+        if path and path.exists():
+            data = path.read_bytes()
+            self.hashes.update(
+                int.from_bytes(data[i:i + HASH_BYTES], "little")
+                for i in range(0, len(data), HASH_BYTES)
+            )
+            LOG.debug("Loaded %d seen slice sets from %s", len(self), path)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, slices: list[Slice]) -> bool:
+        return slice_set_hash(slices) in self.hashes
+
+    def add(self, slices: list[Slice]) -> bool:
+        # False when the slice set was already seen
+        key = slice_set_hash(slices)
+        if key in self.hashes:
+            return False
+        self.hashes.add(key)
+
+        if self.path:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(key.to_bytes(HASH_BYTES, "little"))
+            self._file.flush()
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BloomFilter:
+    # Fixed size alternative to SeenSet for very large volumes. A slice set
+    # that was never seen is reported as seen with probability error_rate,
+    # and then rejected, but a seen one is never accepted again.
+    def __init__(self, capacity: int = BLOOM_CAPACITY,
+                 error_rate: float = BLOOM_ERROR_RATE,
+                 path: pathlib.Path = None):
+        self.path = path
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+        if path and path.exists():
+            data = path.read_bytes()
+            if len(data) == len(self.bits) + 8:
+                self.count = int.from_bytes(data[:8], "little")
+                self.bits[:] = data[8:]
+            else:
+                LOG.warning(
+                    "Ignoring %s, made for another capacity or error rate",
+                    path,
+                )
+
+    def __len__(self):
+        return self.count
+
+    def _indices(self, key: int):
+        # Double hashing, both halves of the 64 bit hash are independent
+        low, high = key & 0xFFFFFFFF, key >> 32 | 1
+        for i in range(self.hash_count):
+            yield (low + i * high) % self.size
+
+    def __contains__(self, slices: list[Slice]) -> bool:
+        return all(
+            self.bits[idx >> 3] >> (idx & 7) & 1
+            for idx in self._indices(slice_set_hash(slices))
+        )
+
+    def add(self, slices: list[Slice]) -> bool:
+        # False when the slice set was (probably) already seen
+        added = False
+        for idx in self._indices(slice_set_hash(slices)):
+            bit = 1 << (idx & 7)
+            if not self.bits[idx >> 3] & bit:
+                self.bits[idx >> 3] |= bit
+                added = True
+        self.count += added
+        return added
+
+    def close(self):
+        if self.path:
+            self.path.write_bytes(
+                self.count.to_bytes(8, "little") + bytes(self.bits)
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,196 @@
+import heapq
+from itertools import combinations, count
+import random
+import time
+
+from . import logging
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import (
+    RebalanceError,
+    RebalanceReport,
+    Slice,
+    Tile,
+    check_slice_balance,
+    draw_all_tiles,
+    slice_composition,
+)
+
+LOG = logging.get_logger(__name__)
+
+TOP_SETS = 10
+# Nodes visited before the search stops with the best sets found so far.
+# Balancing the tiles drawn for a map takes a few thousand nodes. Like
+# map_generation.REBALANCE_TIMEOUT, the timeout in seconds is off by default
+# as it would make results depend on the machine's speed.
+MAX_SEARCH_NODES = 50_000
+SEARCH_TIMEOUT = None
+
+
+def tile_profile(tile: Tile) -> tuple:
+    # Tiles sharing a profile are interchangeable for the balance of a slice
+    return (tile.color, tile.absolute_value, tile.resources, tile.influence)
+
+
+def distinct_combinations(tiles: list[Tile], k: int):
+    seen = set()
+    for combination in combinations(tiles, k):
+        profiles = tuple(tile_profile(tile) for tile in combination)
+        if profiles in seen:
+            continue
+        seen.add(profiles)
+        yield combination
+
+
+def set_score(slices: list[Slice]) -> tuple[float, float]:
+    # Lower is better: value spread first, then total res/inf imbalance
+    return (
+        max(slices).absolute_value - min(slices).absolute_value,
+        sum(abs(s.resources - s.influence) for s in slices),
+    )
+
+
+class BranchAndBound:
+    def __init__(self, tiles: list[Tile], k: int = 6, top: int = TOP_SETS,
+                 timeout: float = SEARCH_TIMEOUT,
+                 max_nodes: int = MAX_SEARCH_NODES):
+        self.k = k
+        self.blue, self.red = slice_composition(k)
+        self.top = top
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+        # Highest value first, so good incumbents are found early
+        self.blue_tiles = sorted(
+            [t for t in tiles if t.color == 'blue'], reverse=True
+        )
+        self.red_tiles = sorted(
+            [t for t in tiles if t.color == 'red'], reverse=True
+        )
+        self.target = sum(t.absolute_value for t in tiles) / k
+
+        self.nodes = 0
+        self.complete = True
+        self._heap = []
+        self._counter = count()
+
+    def _worst_score(self) -> tuple[float, float]:
+        if len(self._heap) < self.top:
+            return (float('inf'), float('inf'))
+        spread, imbalance = self._heap[0][0]
+        return (-spread, -imbalance)
+
+    def _candidates(self, blue_tiles, red_tiles):
+        # The highest remaining blue tile anchors the next slice: slices are
+        # built in a canonical order and no partition is visited twice
+        anchor, others = blue_tiles[0], blue_tiles[1:]
+        red_sets = list(distinct_combinations(red_tiles, self.red))
+        candidates = []
+        for blues in distinct_combinations(others, self.blue - 1):
+            for reds in red_sets:
+                slice_tiles = (anchor, *blues, *reds)
+                resources = sum(t.resources for t in slice_tiles)
+                influence = sum(t.influence for t in slice_tiles)
+                if resources >= 2 * influence or influence >= 2 * resources:
+                    continue
+                value = sum(t.absolute_value for t in slice_tiles)
+                candidates.append((
+                    abs(value - self.target), value,
+                    abs(resources - influence), slice_tiles,
+                ))
+
+        candidates.sort(key=lambda c: c[0])
+        return candidates
+
+    def _search(self, blue_tiles, red_tiles, chosen, low, high,
+                remaining_value, imbalance):
+        if self.nodes >= self.max_nodes or (
+            self.deadline is not None and time.monotonic() > self.deadline
+        ):
+            self.complete = False
+            return
+        self.nodes += 1
+
+        if not blue_tiles:
+            if high >= 1.5 * low:
+                return
+            entry = ((low - high, -imbalance), next(self._counter),
+                     list(chosen))
+            if len(self._heap) < self.top:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+            return
+
+        left = self.k - len(chosen)
+        worst = self._worst_score()
+        for _, value, excess, slice_tiles in self._candidates(
+            blue_tiles, red_tiles
+        ):
+            new_low, new_high = min(low, value), max(high, value)
+            rest = remaining_value - value
+            low_bound, high_bound = new_low, new_high
+            if left > 1:
+                # Some of the remaining slices will be at least, and some
+                # at most, worth the average of what is left
+                average = rest / (left - 1)
+                low_bound = min(low_bound, average)
+                high_bound = max(high_bound, average)
+            # Neither the spread nor the res/inf imbalance can shrink as
+            # more slices are added
+            if (high_bound - low_bound, imbalance + excess) >= worst:
+                continue
+
+            # Tile equality compares values, so filter on identity
+            taken = {id(t) for t in slice_tiles}
+            self._search(
+                [t for t in blue_tiles if id(t) not in taken],
+                [t for t in red_tiles if id(t) not in taken],
+                chosen + [slice_tiles],
+                new_low, new_high, rest,
+                imbalance + excess,
+            )
+            worst = self._worst_score()
+
+    def run(self) -> list[list[Slice]]:
+        self.deadline = None
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        self._search(
+            self.blue_tiles, self.red_tiles, [],
+            float('inf'), float('-inf'),
+            sum(t.absolute_value for t in self.blue_tiles + self.red_tiles),
+            0,
+        )
+        if not self.complete:
+            LOG.warning(
+                "Exact search stopped after %d nodes, results may not be "
+                "optimal", self.nodes,
+            )
+
+        return [
+            [Slice(list(slice_tiles)) for slice_tiles in chosen]
+            for _, _, chosen in sorted(self._heap, reverse=True)
+        ]
+
+
+def best_slice_sets(tiles: list[Tile], top: int = TOP_SETS,
+                    timeout: float = SEARCH_TIMEOUT,
+                    players: int = 6,
+                    max_nodes: int = MAX_SEARCH_NODES) -> list[list[Slice]]:
+    return BranchAndBound(
+        tiles, players, top=top, timeout=timeout, max_nodes=max_nodes
+    ).run()
+
+
+def exact_slices(
+    tiles: list[Tile], players: int = 6, rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], RebalanceReport]:
+    with instrumentation.stage("draw_all_tiles"):
+        drawn = draw_all_tiles(list(tiles), players, rng=rng)
+    search = BranchAndBound(drawn, players, top=1)
+    with instrumentation.stage("exact_search"):
+        results = search.run()
+    if not results or not check_slice_balance(results[0]):
+        raise RebalanceError("No balanced partition of the drawn tiles")
+
+    return results[0], RebalanceReport(iterations=search.nodes)
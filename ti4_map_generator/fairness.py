@@ -0,0 +1,295 @@
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+import json
+import math
+import os
+
+from . import logging, parallel
+from .catalog import get_catalog
+from .map_generation import (
+    ENGINES,
+    HAS_NUMPY,
+    Slice,
+    iter_seeds,
+    prepare_slices,
+)
+
+RUNS = 10000
+CHUNK_SIZE = 64
+
+# Histogram range and bins of every metric. Values outside the range are
+# counted as underflow or overflow.
+METRICS = {
+    "value_ratio": (1.0, 1.5, 25),
+    "res_inf_ratio": (0.5, 2.0, 30),
+    "tech_spread": (0, 6, 6),
+    "wormhole_spread": (0, 4, 4),
+}
+
+
+@dataclass
+class RunningStats:
+    # Welford's online mean and variance
+    count: int = 0
+    mean: float = 0
+    m2: float = 0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'RunningStats'):
+        count = self.count + other.count
+        if not count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class Histogram:
+    low: float
+    high: float
+    bins: int
+    counts: list[int] = None
+    underflow: int = 0
+    overflow: int = 0
+
+    def __post_init__(self):
+        if self.counts is None:
+            self.counts = [0] * self.bins
+
+    def add(self, value: float):
+        if value < self.low:
+            self.underflow += 1
+        elif value > self.high:
+            self.overflow += 1
+        else:
+            idx = int((value - self.low) / (self.high - self.low) * self.bins)
+            # The upper bound falls in the last bin
+            self.counts[min(idx, self.bins - 1)] += 1
+
+    def merge(self, other: 'Histogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def edges(self) -> list[float]:
+        width = (self.high - self.low) / self.bins
+        return [self.low + i * width for i in range(self.bins + 1)]
+
+
+def _spread(counters: list[Counter]) -> int:
+    totals = [sum(counter.values()) for counter in counters]
+    return max(totals) - min(totals)
+
+
+@dataclass
+class FairnessStats:
+    # Constant size however many slice sets are folded in
+    runs: int = 0
+    stats: dict[str, RunningStats] = field(default_factory=lambda: {
+        name: RunningStats() for name in METRICS
+    })
+    histograms: dict[str, Histogram] = field(default_factory=lambda: {
+        name: Histogram(*bins) for name, bins in METRICS.items()
+    })
+    # How often each tile ends up in the best or the worst slice
+    best: Counter = field(default_factory=Counter)
+    worst: Counter = field(default_factory=Counter)
+
+    def _record(self, name: str, value: float):
+        self.stats[name].add(value)
+        self.histograms[name].add(value)
+
+    def add(self, slices: list[Slice]):
+        self.runs += 1
+        best, worst = max(slices), min(slices)
+        self._record(
+            "value_ratio", best.absolute_value / worst.absolute_value
+        )
+        for slice_ in slices:
+            if slice_.influence:
+                self._record(
+                    "res_inf_ratio", slice_.resources / slice_.influence
+                )
+        self._record(
+            "tech_spread", _spread([slice_.technology for slice_ in slices])
+        )
+        self._record(
+            "wormhole_spread", _spread([slice_.wormholes for slice_ in slices])
+        )
+        self.best.update(tile.id_ for tile in best.filter_tiles())
+        self.worst.update(tile.id_ for tile in worst.filter_tiles())
+
+    def add_scores(self, slice_sets: list[list[Slice]], scores):
+        # Same as add() for every set, from the scoring.BatchScores of the
+        # whole batch
+        values = scores.absolute_value
+        best, worst = values.argmax(axis=1), values.argmin(axis=1)
+        wormholes = scores.wormholes.sum(axis=2)
+        for i, slices in enumerate(slice_sets):
+            self.runs += 1
+            self._record(
+                "value_ratio", float(values[i, best[i]] / values[i, worst[i]])
+            )
+            for resources, influence in zip(
+                scores.resources[i].tolist(), scores.influence[i].tolist()
+            ):
+                if influence:
+                    self._record("res_inf_ratio", resources / influence)
+            technology = scores.technology[i]
+            self._record(
+                "tech_spread", int(technology.max() - technology.min())
+            )
+            self._record(
+                "wormhole_spread", int(wormholes[i].max() - wormholes[i].min())
+            )
+            self.best.update(
+                tile.id_ for tile in slices[best[i]].filter_tiles()
+            )
+            self.worst.update(
+                tile.id_ for tile in slices[worst[i]].filter_tiles()
+            )
+
+    def merge(self, other: 'FairnessStats'):
+        self.runs += other.runs
+        for name in METRICS:
+            self.stats[name].merge(other.stats[name])
+            self.histograms[name].merge(other.histograms[name])
+        self.best.update(other.best)
+        self.worst.update(other.worst)
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "metrics": {
+                name: {
+                    "mean": stats.mean,
+                    "stdev": stats.stdev,
+                    "min": stats.min,
+                    "max": stats.max,
+                    "histogram": {
+                        "edges": self.histograms[name].edges(),
+                        "counts": self.histograms[name].counts,
+                        "underflow": self.histograms[name].underflow,
+                        "overflow": self.histograms[name].overflow,
+                    },
+                }
+                for name, stats in self.stats.items()
+            },
+            "best": {str(id_): n for id_, n in sorted(self.best.items())},
+            "worst": {str(id_): n for id_, n in sorted(self.worst.items())},
+        }
+
+
+def analyze_chunk(engine: str, seeds: list[int]) -> FairnessStats:
+    # Folded in the worker, only the accumulators go back to the parent
+    tiles = get_catalog().tiles
+    result = FairnessStats()
+    slice_sets = [
+        prepare_slices(engine=engine, tiles=tiles, seed=seed)
+        for seed in seeds
+    ]
+    if HAS_NUMPY and slice_sets:
+        # Scored as one batch rather than slice by slice
+        from .scoring import score_slice_sets
+        result.add_scores(slice_sets, score_slice_sets(tiles, slice_sets))
+    else:
+        for slices in slice_sets:
+            result.add(slices)
+    return result
+
+
+def analyze(runs: int = RUNS, engine: str = 'rebalance', seed: int = None,
+            workers: int = None,
+            chunk_size: int = CHUNK_SIZE) -> FairnessStats:
+    workers = workers or os.cpu_count()
+    seeds = iter_seeds(seed, runs)
+    chunks = iter(lambda: list(itertools.islice(seeds, chunk_size)), [])
+    result = FairnessStats()
+
+    with ProcessPoolExecutor(
+        workers, initializer=parallel.init_worker
+    ) as pool:
+        pending = deque(
+            pool.submit(analyze_chunk, engine, chunk)
+            for chunk in itertools.islice(chunks, 2 * workers)
+        )
+        while pending:
+            chunk_stats = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(pool.submit(analyze_chunk, engine, chunk))
+            result.merge(chunk_stats)
+    return result
+
+
+def print_report(result: FairnessStats, top: int = 5):
+    print(f"{result.runs} slice sets")
+    for name, stats in result.stats.items():
+        print(
+            f"{name:16} mean {stats.mean:.4g} stdev {stats.stdev:.4g} "
+            f"min {stats.min:.4g} max {stats.max:.4g}"
+        )
+        histogram = result.histograms[name]
+        peak = max(histogram.counts) or 1
+        for edge, count in zip(histogram.edges(), histogram.counts):
+            print(f"  {edge:8.3f} {count:10} {'#' * (40 * count // peak)}")
+
+    tiles = get_catalog().tiles
+    for label, counter in (("best", result.best), ("worst", result.worst)):
+        # Share of the sets where the tile is in that slice
+        shares = sorted(
+            ((counter[tile.id_] / result.runs, tile.id_) for tile in tiles),
+            reverse=True,
+        )
+        print(f"Most often in the {label} slice:")
+        for share, id_ in shares[:top]:
+            print(f"  tile {id_:3} {share:.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure how fair the generated slices are"
+    )
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--engine", choices=ENGINES, default="rebalance")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON"
+    )
+    parser.add_argument(
+        "--log-level",
+        help=f"Logging level, defaults to ${logging.LEVEL_ENV} or "
+             f"{logging.DEFAULT_LEVEL}",
+    )
+    args = parser.parse_args(argv)
+    logging.configure(args.log_level)
+
+    result = analyze(args.runs, args.engine, args.seed, args.workers)
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=4))
+    else:
+        print_report(result)
@@ -0,0 +1,205 @@
+from functools import lru_cache
+import pathlib
+import random
+
+from . import logging, placement, travel
+from .connectivity import WormholeGraph
+from .geometry import DIRECTIONS, HexLayout, add, get_layout, scale
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import (
+    CONFIG_PATH,
+    Slice,
+    Tile,
+    load_planets,
+    prepare_slices,
+)
+
+LOG = logging.get_logger(__name__)
+
+SEATS = 6
+MECATOL_REX_ID = 18
+# Seat orders tried before keeping the one breaking the fewest rules
+MAX_ARRANGEMENTS = 24
+# Share of a system's value counted for a home system, by distance
+DISTANCE_WEIGHTS = (0, 1, 0.5, 0.25)
+# How seat values count the systems around home systems: by distance alone,
+# or by movement cost through anomalies and wormholes
+VALUATIONS = ('distance', 'travel')
+
+# The standard map: Mecatol Rex, then rings 1 to 3, 37 hexes in all
+LAYOUT = get_layout("galaxy")
+CENTER = LAYOUT.index[(0, 0)]
+
+# The hex flower of a slice (see placement) is centred on the ring 2 corner
+# in front of the home system. Going around it: a ring 3 hex, the home
+# system, the other ring 3 hex, a ring 2 hex of the next seat, the ring 1
+# hex in front and the slice's ring 2 hex.
+HOME_SLOT = 2
+
+
+def _seat_hexes(seat: int) -> tuple[int, ...]:
+    # Index in LAYOUT of every slot of the seat's hex flower. Seats follow
+    # the ring 3 corners in ring order.
+    direction = (4 + seat) % 6
+    front = scale(DIRECTIONS[direction], 2)
+    coordinates = [front] + [
+        add(front, DIRECTIONS[(direction + slot - 2) % 6])
+        for slot in range(1, placement.SLOTS)
+    ]
+    return tuple(LAYOUT.index[hex_] for hex_ in coordinates)
+
+
+SEAT_HEXES = tuple(_seat_hexes(seat) for seat in range(SEATS))
+HOMES = tuple(hexes[HOME_SLOT] for hexes in SEAT_HEXES)
+
+
+@lru_cache()
+def mecatol_rex(config_path: pathlib.Path = CONFIG_PATH) -> Tile:
+    planets = load_planets(config_path)
+    return Tile(MECATOL_REX_ID, 'center', [planets["Mecatol Rex"]])
+
+
+class Galaxy:
+    def __init__(self, tiles: list[Tile], layout: HexLayout = LAYOUT,
+                 homes: tuple[int, ...] = HOMES):
+        # One entry per hex of the layout, None for home systems
+        self.tiles = tiles
+        self.layout = layout
+        self.homes = homes
+
+    def map_string(self) -> str:
+        # Tile ids ring by ring after Mecatol Rex, 0 for home systems
+        return " ".join(
+            str(tile.id_ if tile else 0) for tile in self.tiles[1:]
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "tiles": [
+                {
+                    "q": q,
+                    "r": r,
+                    "ring": self.layout.rings[idx],
+                    "tile": tile.id_ if tile else None,
+                    "home": idx in self.homes,
+                }
+                for idx, ((q, r), tile) in enumerate(
+                    zip(self.layout.coordinates, self.tiles)
+                )
+            ],
+            "map_string": self.map_string(),
+            "seat_values": seat_values(self),
+            "travel_values": seat_values(self, 'travel'),
+        }
+
+
+def seat_values(galaxy: Galaxy, valuation: str = 'distance') -> list[float]:
+    # Value of the systems around each home system, the closest counting
+    # the most
+    if valuation not in VALUATIONS:
+        raise ValueError(f"Unknown valuation: {valuation}")
+    if valuation == 'travel':
+        return travel.travel_values(galaxy.tiles, galaxy.layout, galaxy.homes)
+
+    values = []
+    for home in galaxy.homes:
+        distances = galaxy.layout.distances[home]
+        value = 0
+        for tile, distance in zip(galaxy.tiles, distances):
+            if tile is not None and distance < len(DISTANCE_WEIGHTS):
+                value += tile.absolute_value * DISTANCE_WEIGHTS[distance]
+        values.append(value)
+    return values
+
+
+def rule_violations(tiles: list[Tile], layout: HexLayout = LAYOUT) -> int:
+    # Adjacent anomalies and adjacent wormholes, as in placement
+    violations = 0
+    for i, j in layout.adjacent_pairs:
+        if tiles[i] is None or tiles[j] is None:
+            continue
+        if placement.is_anomaly(tiles[i]) and placement.is_anomaly(tiles[j]):
+            violations += 1
+        if tiles[i].wormholes and tiles[j].wormholes:
+            violations += 1
+    return violations
+
+
+def validate_galaxy(galaxy: Galaxy) -> list[str]:
+    # Problems making the map unplayable, none for a valid map
+    problems = []
+    if len(galaxy.tiles) != len(galaxy.layout):
+        return [f"Expected {len(galaxy.layout)} hexes, "
+                f"got {len(galaxy.tiles)}"]
+
+    center = galaxy.tiles[CENTER]
+    if center is None or center.id_ != MECATOL_REX_ID:
+        problems.append("Mecatol Rex is not at the centre")
+    for idx, tile in enumerate(galaxy.tiles):
+        if idx in galaxy.homes:
+            if tile is not None:
+                problems.append(f"Tile {tile.id_} on home system {idx}")
+        elif tile is None:
+            problems.append(f"Hex {idx} is empty")
+
+    ids = [tile.id_ for tile in galaxy.tiles if tile]
+    for id_ in sorted({id_ for id_ in ids if ids.count(id_) > 1}):
+        problems.append(f"Tile {id_} is used more than once")
+
+    if not WormholeGraph.from_galaxy(galaxy).is_connected():
+        problems.append("Some systems cannot be reached")
+    return problems
+
+
+def lay_out(slices: list[Slice], seats: list[int]) -> list[Tile]:
+    # slices[i] goes to seats[i]
+    tiles = [None] * len(LAYOUT)
+    tiles[CENTER] = mecatol_rex()
+    for slice_, seat in zip(slices, seats):
+        for slot, hex_idx in enumerate(SEAT_HEXES[seat]):
+            if slice_.tiles[slot] is not None:
+                tiles[hex_idx] = slice_.tiles[slot]
+    return tiles
+
+
+def build_galaxy(slices: list[Slice], rng: random.Random = None,
+                 max_arrangements: int = MAX_ARRANGEMENTS) -> Galaxy:
+    # Slices must already be placed. Neighbouring slices can break the
+    # placement rules between them, so a few seat orders are tried.
+    if len(slices) != SEATS:
+        raise ValueError(
+            f"Galaxy maps are laid out for {SEATS} players, "
+            f"got {len(slices)} slices"
+        )
+    rng = rng or random
+
+    best, best_violations = None, None
+    seats = list(range(SEATS))
+    for _ in range(max_arrangements):
+        tiles = lay_out(slices, seats)
+        violations = rule_violations(tiles)
+        if best is None or violations < best_violations:
+            best, best_violations = tiles, violations
+        if not violations:
+            break
+        rng.shuffle(seats)
+
+    LOG.debug("Laid out galaxy with %d rule violations", best_violations)
+    return Galaxy(best)
+
+
+def generate_galaxy(engine: str = 'rebalance', tiles: list[Tile] = None,
+                    seed: int = None, rng: random.Random = None,
+                    instrumentation=NULL_INSTRUMENTATION) -> Galaxy:
+    rng = rng or random.Random(seed)
+    slices = prepare_slices(
+        engine=engine, tiles=tiles, rng=rng, players=SEATS,
+        instrumentation=instrumentation,
+    )
+    with instrumentation.stage("build_galaxy"):
+        galaxy = build_galaxy(slices, rng=rng)
+
+    problems = validate_galaxy(galaxy)
+    if problems:
+        raise ValueError("Invalid galaxy: " + "; ".join(problems))
+    return galaxy
@@ -0,0 +1,104 @@
+# Hexes are in axial coordinates (q, r). Directions are listed around a hex,
+# so consecutive directions point to adjacent neighbours.
+DIRECTIONS = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+ORIGIN = (0, 0)
+
+
+def add(a: tuple[int, int], b: tuple[int, int]) -> tuple[int, int]:
+    return (a[0] + b[0], a[1] + b[1])
+
+
+def scale(a: tuple[int, int], k: int) -> tuple[int, int]:
+    return (a[0] * k, a[1] * k)
+
+
+def distance(a: tuple[int, int], b: tuple[int, int]) -> int:
+    dq, dr = a[0] - b[0], a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def ring(center: tuple[int, int], radius: int) -> list[tuple[int, int]]:
+    # Hexes at radius from center, walking around from the corner in
+    # direction 4. Corners are every radius hexes.
+    if radius == 0:
+        return [center]
+    hexes = []
+    hex_ = add(center, scale(DIRECTIONS[4], radius))
+    for direction in DIRECTIONS:
+        for _ in range(radius):
+            hexes.append(hex_)
+            hex_ = add(hex_, direction)
+    return hexes
+
+
+def spiral(center: tuple[int, int], radius: int) -> list[tuple[int, int]]:
+    # Center first, then every ring out to radius
+    return [
+        hex_ for k in range(radius + 1) for hex_ in ring(center, k)
+    ]
+
+
+class HexLayout:
+    # A set of hexes, each known by its index. Rings, neighbours and
+    # distances are computed once, so maps built on the layout only do index
+    # lookups.
+    def __init__(self, coordinates: list[tuple[int, int]]):
+        self.coordinates = tuple(coordinates)
+        self.index = {hex_: idx for idx, hex_ in enumerate(self.coordinates)}
+        self.rings = tuple(
+            distance(hex_, ORIGIN) for hex_ in self.coordinates
+        )
+        self.neighbours = tuple(
+            tuple(
+                self.index[add(hex_, direction)]
+                for direction in DIRECTIONS
+                if add(hex_, direction) in self.index
+            )
+            for hex_ in self.coordinates
+        )
+        self.adjacent_pairs = tuple(
+            (i, j)
+            for i, neighbours in enumerate(self.neighbours)
+            for j in neighbours if i < j
+        )
+        # distances[i][j] is the number of steps from hex i to hex j
+        self.distances = tuple(
+            bytes(distance(a, b) for b in self.coordinates)
+            for a in self.coordinates
+        )
+
+        by_ring = {}
+        for idx, radius in enumerate(self.rings):
+            by_ring.setdefault(radius, []).append(idx)
+        self.ring_indices = {
+            radius: tuple(indices) for radius, indices in by_ring.items()
+        }
+
+    @classmethod
+    def hexagon(cls, radius: int) -> 'HexLayout':
+        return cls(spiral(ORIGIN, radius))
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def is_adjacent(self, i: int, j: int) -> bool:
+        return self.distances[i][j] == 1
+
+
+# Every supported layout, built on first use
+LAYOUTS = {
+    # The hex flower of a slice, slot 0 in the centre and slots 1 to 6
+    # around it
+    "slice": lambda: HexLayout([ORIGIN, *DIRECTIONS]),
+    # The standard map, Mecatol Rex in the centre and 3 rings around it
+    "galaxy": lambda: HexLayout.hexagon(3),
+}
+_layouts: dict[str, HexLayout] = {}
+
+
+def get_layout(name: str) -> HexLayout:
+    if name not in LAYOUTS:
+        raise ValueError(f"Unknown hex layout: {name}")
+    if name not in _layouts:
+        _layouts[name] = LAYOUTS[name]()
+    return _layouts[name]
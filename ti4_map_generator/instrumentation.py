@@ -0,0 +1,62 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+import time
+from typing import Callable
+
+# Receives metric names such as "time.draw_all_tiles" or "count.restarts"
+Hook = Callable[[str, float], None]
+
+
+@dataclass
+class GenerationStats:
+    # Wall time per stage, in seconds
+    timings: dict[str, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+    counters: Counter = field(default_factory=Counter)
+    # RebalanceReport of the engine run that balanced the slices
+    report: object = None
+
+
+class Instrumentation:
+    def __init__(self, hooks: list[Hook] = ()):
+        self.stats = GenerationStats()
+        self.hooks = list(hooks)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.timings[name] += elapsed
+            for hook in self.hooks:
+                hook(f"time.{name}", elapsed)
+
+    def count(self, name: str, value: int = 1):
+        self.stats.counters[name] += value
+        for hook in self.hooks:
+            hook(f"count.{name}", value)
+
+    def record_report(self, report):
+        self.stats.report = report
+
+
+class NullInstrumentation:
+    # Default when instrumentation is off: every call is a no-op
+    stats = None
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def record_report(self, report):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -1,5 +1,16 @@
+import atexit
+import logging.handlers
+import multiprocessing.util
+import os
+import queue
+
 import colorlog
 
+ROOT_LOGGER = "ti4_map_generator"
+LEVEL_ENV = "TI4_LOG_LEVEL"
+QUEUE_ENV = "TI4_LOG_QUEUE"
+DEFAULT_LEVEL = "INFO"
+
 formatter = colorlog.ColoredFormatter(
     "%(asctime)s [%(log_color)s%(levelname)s%(reset)s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
@@ -18,8 +29,68 @@ formatter = colorlog.ColoredFormatter(
 handler = colorlog.StreamHandler()
 handler.setFormatter(formatter)
 
+_installed = []
+_listener = None
+_settings = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener:
+        # Flushes the records still in the queue
+        _listener.stop()
+        _listener = None
+
+
+def configure(level: str = None, queued: bool = None,
+              target: logging.Handler = handler):
+    # Without arguments, settings come from the environment
+    if level is None:
+        level = os.environ.get(LEVEL_ENV, DEFAULT_LEVEL)
+    if queued is None:
+        queued = os.environ.get(QUEUE_ENV, "") not in ("", "0")
+
+    global _settings
+    _settings = (level, queued, target)
+    root = colorlog.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper())
+
+    _stop_listener()
+    while _installed:
+        root.removeHandler(_installed.pop())
+
+    if queued:
+        # Records are written by a background thread, generation never
+        # waits on the stream
+        global _listener
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, target)
+        _listener.start()
+        target = logging.handlers.QueueHandler(records)
+
+    root.addHandler(target)
+    _installed.append(target)
+
+
+def _after_fork():
+    # The listener thread is not copied into forked processes, such as pool
+    # workers, so nothing would drain their queue. They get their own.
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    configure(*_settings)
+    # Pool workers leave through os._exit(), without running atexit
+    multiprocessing.util.Finalize(None, _stop_listener, exitpriority=0)
+
+
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_after_fork)
+
 
 def get_logger(name):
-    logger = colorlog.getLogger(name)
-    logger.addHandler(handler)
-    return logger
+    # Loggers of the package propagate to the root one, which gets its
+    # handler only once
+    if not _installed:
+        configure()
+    return colorlog.getLogger(name)
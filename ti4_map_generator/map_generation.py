@@ -1,18 +1,59 @@
 #!/usr/bin/env python3
 
+from collections import Counter
 import csv
 from dataclasses import dataclass
 from functools import total_ordering
+import importlib.util
+import itertools
 import pathlib
 import json
 import random
+import time
 
-from . import logging
+from . import logging, placement
+from .instrumentation import (
+    NULL_INSTRUMENTATION,
+    GenerationStats,
+    Instrumentation,
+)
 
 LOG = logging.get_logger(__name__)
-LOG.setLevel("DEBUG")
 
 CONFIG_PATH = pathlib.Path("config")
+WORMHOLE_TYPES = "AB"
+
+# Blue and red tiles of each slice by player count. The 19 blue and 12 red
+# tiles only leave room for 3 tiles per slice with 7 or 8 players.
+SLICE_COMPOSITION = {
+    3: (3, 2),
+    4: (3, 2),
+    5: (3, 2),
+    6: (3, 2),
+    7: (2, 1),
+    8: (2, 1),
+}
+PLAYER_COUNTS = tuple(SLICE_COMPOSITION)
+
+# Budget of a single rebalance attempt before starting over from a new draw.
+# The iteration budget keeps the result of a seed the same on every machine.
+# A timeout, in seconds, can cap slow attempts too, but then the result
+# depends on the machine's speed, so it is off by default.
+MAX_REBALANCE_ITERATIONS = 100
+REBALANCE_TIMEOUT = None
+MAX_RESTARTS = 100
+# Fresh draws given to an engine that could not balance the previous one
+MAX_REDRAWS = 10
+
+
+class RebalanceError(RuntimeError):
+    pass
+
+
+@dataclass
+class RebalanceReport:
+    iterations: int = 0
+    restarts: int = 0
 
 
 @dataclass
@@ -81,16 +122,43 @@ class Slice:
         self.tiles = tiles
         self.update_values()
 
+    def to_dict(self) -> dict:
+        return {
+            "tiles": [tile.id_ if tile else None for tile in self.tiles],
+            "absolute_value": self.absolute_value,
+            "resources": self.resources,
+            "influence": self.influence,
+            "technology": "".join(sorted(self.technology.elements())),
+            "wormholes": "".join(sorted(self.wormholes.elements())),
+        }
+
     def update_values(self):
         self.resources = self.influence = self.absolute_value = 0
-        self.technology = self.wormholes = ""
-
-        for tile in self.tiles:
-            self.resources += tile.resources
-            self.influence += tile.influence
-            self.technology += tile.technology
-            self.wormholes += tile.wormholes
-            self.absolute_value += tile.absolute_value
+        self.technology = Counter()
+        self.wormholes = Counter()
+
+        for tile in self.filter_tiles():
+            self._add_values(tile)
+
+    def _add_values(self, tile: Tile):
+        self.resources += tile.resources
+        self.influence += tile.influence
+        self.absolute_value += tile.absolute_value
+        self.technology.update(tile.technology)
+        self.wormholes.update(tile.wormholes)
+
+    def _remove_values(self, tile: Tile):
+        self.resources -= tile.resources
+        self.influence -= tile.influence
+        self.absolute_value -= tile.absolute_value
+        for counter, keys in (
+            (self.technology, tile.technology),
+            (self.wormholes, tile.wormholes),
+        ):
+            for key in keys:
+                counter[key] -= 1
+                if not counter[key]:
+                    del counter[key]
 
     def __eq__(self, slice_):
         return self.absolute_value == slice_.absolute_value
@@ -110,13 +178,13 @@ class Slice:
         self.tiles.sort(reverse=True)
         for idx, tile in enumerate(self.tiles):
             if tile.color == color:
-                return self.tiles.pop(idx)
+                return self.pop(idx)
 
     def remove_worst_tile(self, color='blue'):
         self.tiles.sort()
         for idx, tile in enumerate(self.tiles):
             if tile.color == color:
-                return self.tiles.pop(idx)
+                return self.pop(idx)
 
     def remove_excessive_tile(self):
         if self.resources > self.influence:
@@ -125,89 +193,87 @@ class Slice:
             comparator = 'influence'
 
         self.tiles.sort(key=lambda x: getattr(x, comparator), reverse=True)
-        return self.tiles.pop(0)
+        return self.pop(0)
+
+    def pop(self, idx: int) -> Tile:
+        tile = self.tiles.pop(idx)
+        self._remove_values(tile)
+        return tile
 
     def add(self, tile: Tile):
         self.tiles.append(tile)
-        self.update_values()
+        self._add_values(tile)
+
+    def swap(self, idx: int, tile: Tile) -> Tile:
+        old_tile, self.tiles[idx] = self.tiles[idx], tile
+        self._remove_values(old_tile)
+        self._add_values(tile)
+        return old_tile
 
     def filter_tiles(self, color=None):
         for tile in self.tiles:
+            if tile is None:
+                # Empty slot once tiles are placed
+                continue
             if color and tile.color != color:
                 continue
             yield tile
 
-    def place_tiles(self) -> list[Tile]:
-        random.shuffle(self.tiles)
-        result = [None] * 7
-        non_allocated = [1, 3, 5, 6]
-        random.shuffle(non_allocated)
-
-        def adjacent(pos_a, pos_b):
-            return (
-                pos_a == 0
-                or pos_b == 0
-                or (pos_a + 1) % 6 == pos_b
-                or (pos_b + 1) % 6 == pos_a
-            )
-
-        multiple_anomalies = \
-            len([tile for tile in self.tiles if tile.anomalies]) > 1
-        # Place the blue tiles
-        for i, tile in enumerate(self.filter_tiles(color='blue')):
-            if i == 0 and multiple_anomalies:
-                # If there are multiple anomalies, none can be placed on the
-                # middle slot, thus we must force a blue tile to be there
-                non_allocated.insert(0, 0)
-            elif i == 0:
-                # We don't care which tile goes to the middle slot
-                non_allocated.insert(
-                    random.randint(0, len(non_allocated) - 1),
-                    0
-                )
-            result[non_allocated.pop(0)] = tile
-
-        # Place the red tiles
-        for tile in self.filter_tiles(color='red'):
-            result[non_allocated.pop(0)] = tile
-
-        self.tiles = result
-        return result
+    def place_tiles(self, rng: random.Random = None) -> list[Tile]:
+        self.tiles = placement.place_tiles(list(self.filter_tiles()), rng)
+        return self.tiles
 
 
-def draw_all_tiles(tiles: list[Tile], players: int = 6):
-    if players != 6:
-        raise NotImplementedError("<6 players not handled yet")
-
-    # Exclude a random blue tile
-    random.shuffle(tiles)
-    while True:
-        tile = tiles.pop(0)
-        if tile.color == 'red':
-            tiles.append(tile)
+def slice_composition(players: int) -> tuple[int, int]:
+    # Blue and red tiles in each of the players slices
+    if players not in SLICE_COMPOSITION:
+        raise ValueError(
+            f"Unsupported player count: {players}, expected "
+            f"{PLAYER_COUNTS[0]} to {PLAYER_COUNTS[-1]}"
+        )
+    return SLICE_COMPOSITION[players]
+
+
+def draw_all_tiles(tiles: list[Tile], players: int = 6,
+                   rng: random.Random = None):
+    # Exclude random tiles of each color until exactly enough are left for
+    # the slices of every player
+    blue, red = slice_composition(players)
+    needed = {'blue': players * blue, 'red': players * red}
+    excess = Counter(tile.color for tile in tiles)
+    excess.subtract(needed)
+    if any(excess[color] < 0 for color in needed):
+        raise ValueError(f"Not enough tiles for {players} players")
+
+    (rng or random).shuffle(tiles)
+    drawn = []
+    for tile in tiles:
+        if excess[tile.color] > 0:
+            excess[tile.color] -= 1
         else:
-            break
+            drawn.append(tile)
 
-    return tiles
+    return drawn
 
 
-def generate_slices(tiles: list[Tile], k: int = 6) -> list[Slice]:
-    if k != 6:
-        raise NotImplementedError("<6 players not handled yet")
+def generate_slices(tiles: list[Tile], k: int = 6,
+                    rng: random.Random = None) -> list[Slice]:
+    rng = rng or random
+    blue, red = slice_composition(k)
 
     slices = []
 
     # Pretty much random right now
     red_tiles = [t for t in tiles if t.color == 'red']
-    random.shuffle(red_tiles)
+    rng.shuffle(red_tiles)
     blue_tiles = [t for t in tiles if t.color == 'blue']
-    random.shuffle(blue_tiles)
+    rng.shuffle(blue_tiles)
 
     for i in range(k):
         slice_tiles = []
-        for j in range(2):
+        for j in range(red):
             slice_tiles.append(red_tiles.pop(0))
-        for j in range(3):
+        for j in range(blue):
             slice_tiles.append(blue_tiles.pop(0))
 
         slices.append(Slice(slice_tiles))
@@ -229,12 +295,13 @@ def check_slice_balance(slices: list[Slice]) -> bool:
     return True
 
 
-def rebalance_slices(slices):
+def rebalance_slices(slices, instrumentation=NULL_INSTRUMENTATION):
     # Rebalance, if needed, between best and worst slices
     slices.sort()
     worst_slice, best_slice = slices[0], slices[-1]
     if best_slice.absolute_value >= 1.5 * worst_slice.absolute_value:
         LOG.debug("Rebalancing between best and worst slice")
+        instrumentation.count("moves.best_worst_swap")
         best_tile = best_slice.remove_best_tile()
         worst_tile = worst_slice.remove_worst_tile(color=best_tile.color)
 
@@ -258,6 +325,7 @@ def rebalance_slices(slices):
         )
     ):
         LOG.debug("Rebalancing due to unbalanced res/inf ratio in slice")
+        instrumentation.count("moves.res_inf_swap")
         best_inf_tile = most_influence_heavy_slice.remove_excessive_tile()
         best_res_tile = most_resources_heavy_slice.remove_excessive_tile()
 
@@ -267,40 +335,218 @@ def rebalance_slices(slices):
     return slices
 
 
-def prepare_slices():
-    with open(CONFIG_PATH.joinpath("tiles.json")) as f:
-        tiles_raw = json.load(f)
+def slices_state(slices: list[Slice]) -> int:
+    # Neither the order of the slices nor of their tiles matters
+    return hash(tuple(sorted(
+        tuple(sorted(tile.id_ for tile in slice_.tiles)) for slice_ in slices
+    )))
+
 
-    with open(CONFIG_PATH.joinpath("planets.csv")) as f:
+def _rebalance(
+    slices: list[Slice],
+    max_iterations: int,
+    timeout: float,
+    report: RebalanceReport,
+    instrumentation,
+) -> tuple[list[Slice], bool]:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    seen = {slices_state(slices)}
+
+    for _ in range(max_iterations):
+        if check_slice_balance(slices):
+            return slices, True
+
+        LOG.debug("Rebalacing slices")
+        slices = rebalance_slices(slices, instrumentation)
+        report.iterations += 1
+
+        state = slices_state(slices)
+        if state in seen:
+            # The same moves would be applied again from here on
+            LOG.debug("Rebalancing is cycling between the same slices")
+            return slices, False
+        seen.add(state)
+
+        if deadline is not None and time.monotonic() > deadline:
+            LOG.debug("Rebalancing took too long")
+            return slices, False
+
+    return slices, check_slice_balance(slices)
+
+
+def balance_slices(
+    tiles: list[Tile],
+    players: int = 6,
+    max_iterations: int = MAX_REBALANCE_ITERATIONS,
+    timeout: float = REBALANCE_TIMEOUT,
+    max_restarts: int = MAX_RESTARTS,
+    rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], RebalanceReport]:
+    report = RebalanceReport()
+
+    while True:
+        with instrumentation.stage("draw_all_tiles"):
+            drawn = draw_all_tiles(list(tiles), players, rng=rng)
+        with instrumentation.stage("generate_slices"):
+            slices = generate_slices(drawn, players, rng=rng)
+        with instrumentation.stage("rebalance"):
+            slices, balanced = _rebalance(
+                slices, max_iterations, timeout, report, instrumentation
+            )
+        if balanced:
+            return slices, report
+
+        if report.restarts >= max_restarts:
+            raise RebalanceError(
+                f"Could not balance slices after {report.restarts} restarts"
+            )
+        report.restarts += 1
+
+
+def load_planets(config_path: pathlib.Path = CONFIG_PATH) -> dict:
+    with open(config_path.joinpath("planets.csv")) as f:
         planets = {r["name"]: r for r in csv.DictReader(f)}
         for p_name, p in planets.items():
             planets[p_name]['technology'] = p['technology'] or ''
             planets[p_name]['resources'] = int(p['resources'])
             planets[p_name]['influence'] = int(p['influence'])
+    return planets
+
+
+def load_tiles(config_path: pathlib.Path = CONFIG_PATH,
+               instrumentation=NULL_INSTRUMENTATION) -> list[Tile]:
+    with instrumentation.stage("parse_config"):
+        with open(config_path.joinpath("tiles.json")) as f:
+            tiles_raw = json.load(f)
+
+        planets = load_planets(config_path)
 
     tiles = []
-    for tile in tiles_raw:
-        replaced_planets = []
-        for planet_name in tile.get('planets', []):
-            replaced_planets.append(planets[planet_name])
-        tiles.append(Tile(
-            tile['id'],
-            tile['color'],
-            replaced_planets,
-            tile.get('anomalies')
-        ))
-
-    all_tiles = draw_all_tiles(tiles)
-
-    slices = generate_slices(all_tiles)
-    while True:
-        success = check_slice_balance(slices)
-        if success:
-            break
-        LOG.debug("Rebalacing slices")
-        slices = rebalance_slices(slices)
+    with instrumentation.stage("build_tiles"):
+        for tile in tiles_raw:
+            replaced_planets = []
+            for planet_name in tile.get('planets', []):
+                replaced_planets.append(planets[planet_name])
+            tiles.append(Tile(
+                tile['id'],
+                tile['color'],
+                replaced_planets,
+                tile.get('anomalies')
+            ))
 
-    for slice_ in slices:
-        slice_.place_tiles()
+    return tiles
+
+
+# The sampling engine needs the numpy extra, and is only offered with it
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+ENGINES = (
+    'rebalance', 'annealing', 'exact',
+    *(('sampling',) if HAS_NUMPY else ()),
+    'table',
+)
+
+
+def get_engine(name: str):
+    if name == 'rebalance':
+        return balance_slices
+    if name == 'annealing':
+        from .annealing import anneal_slices
+        return anneal_slices
+    if name == 'exact':
+        from .exact import exact_slices
+        return exact_slices
+    if name == 'sampling':
+        if not HAS_NUMPY:
+            raise ValueError(
+                "The sampling engine requires numpy, install the numpy extra"
+            )
+        from .scoring import sample_slices
+        return sample_slices
+    if name == 'table':
+        from .slice_table import table_slices
+        return table_slices
+
+    raise ValueError(f"Unknown balancing engine: {name}")
+
+
+def prepare_slices(engine: str = 'rebalance', tiles: list[Tile] = None,
+                   seed: int = None, rng: random.Random = None,
+                   players: int = 6,
+                   instrumentation=NULL_INSTRUMENTATION):
+    # The same seed always gives the same slices, and concurrent calls do
+    # not share any RNG state
+    rng = rng or random.Random(seed)
+    if tiles is None:
+        from .catalog import get_catalog
+        with instrumentation.stage("load_catalog"):
+            tiles = get_catalog(instrumentation=instrumentation).tiles
+
+    # Some draws cannot be balanced at all, mostly with 7 or 8 players
+    for redraw in range(MAX_REDRAWS + 1):
+        try:
+            with instrumentation.stage("balance"):
+                slices, report = get_engine(engine)(
+                    tiles, players=players, rng=rng,
+                    instrumentation=instrumentation,
+                )
+            break
+        except RebalanceError:
+            if redraw == MAX_REDRAWS:
+                raise
+            LOG.debug("Could not balance the drawn tiles, drawing again")
+            instrumentation.count("redraws")
+    instrumentation.record_report(report)
+    instrumentation.count("iterations", report.iterations)
+    instrumentation.count("restarts", report.restarts)
+    LOG.debug(
+        "Balanced slices after %d iterations and %d restarts",
+        report.iterations, report.restarts
+    )
+
+    with instrumentation.stage("place_tiles"):
+        for slice_ in slices:
+            slice_.place_tiles(rng=rng)
 
     return slices
+
+
+def prepare_slices_with_stats(
+    hooks=(), **kwargs
+) -> tuple[list[Slice], GenerationStats]:
+    instrumentation = Instrumentation(hooks)
+    slices = prepare_slices(instrumentation=instrumentation, **kwargs)
+    return slices, instrumentation.stats
+
+
+def iter_seeds(seed: int = None, count: int = None):
+    # Every slice set gets its own seed, derived from the master seed
+    seeds = random.Random(seed)
+    sets = itertools.count() if count is None else range(count)
+    for _ in sets:
+        yield seeds.getrandbits(64)
+
+
+def iter_slice_sets(count: int = None, engine: str = 'rebalance',
+                    tiles: list[Tile] = None, seed: int = None, seen=None,
+                    players: int = 6):
+    # Yields balanced slice sets one by one, forever if count is None. Sets
+    # already in seen (see dedup) are skipped and do not count.
+    if tiles is None:
+        from .catalog import get_catalog
+        tiles = get_catalog().tiles
+
+    seeds = iter_seeds(seed, count if seen is None else None)
+    yielded = 0
+    while count is None or yielded < count:
+        set_seed = next(seeds, None)
+        if set_seed is None:
+            return
+        slices = prepare_slices(
+            engine=engine, tiles=tiles, seed=set_seed, players=players
+        )
+        if seen is not None and not seen.add(slices):
+            LOG.debug("Skipping a slice set already seen")
+            continue
+        yielded += 1
+        yield slices
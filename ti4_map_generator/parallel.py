@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+
+from .catalog import get_catalog
+from .map_generation import Slice, Tile, iter_seeds, prepare_slices
+
+CHUNK_SIZE = 16
+
+_tiles = None
+
+
+def init_worker():
+    global _tiles
+    _tiles = get_catalog().tiles
+
+
+def generate_chunk(engine: str, seeds: list[int],
+                   players: int = 6) -> list[tuple]:
+    results = []
+    for seed in seeds:
+        # Sets are seeded individually, so results do not depend on which
+        # worker produced them
+        slices = prepare_slices(
+            engine=engine, tiles=_tiles, seed=seed, players=players
+        )
+        # Only tile ids go back to the parent process
+        results.append(tuple(
+            tuple(tile.id_ if tile else None for tile in slice_.tiles)
+            for slice_ in slices
+        ))
+    return results
+
+
+def slices_from_ids(ids: tuple, tiles_by_id: dict[int, Tile]) -> list[Slice]:
+    return [
+        Slice([tiles_by_id[id_] if id_ is not None else None
+               for id_ in slice_ids])
+        for slice_ids in ids
+    ]
+
+
+def iter_parallel_slice_sets(count: int = None, engine: str = 'rebalance',
+                             seed: int = None, workers: int = None,
+                             chunk_size: int = CHUNK_SIZE, seen=None,
+                             players: int = 6):
+    workers = workers or os.cpu_count()
+    tiles_by_id = {tile.id_: tile for tile in get_catalog().tiles}
+
+    # Same seeds as iter_slice_sets(), so both yield the same slice sets.
+    # Duplicates are dropped here in the parent, where seen lives.
+    seeds = iter_seeds(seed, count if seen is None else None)
+    yielded = 0
+    chunks = iter(lambda: list(itertools.islice(seeds, chunk_size)), [])
+
+    with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+        # Keep a bounded number of chunks in flight and hand results back in
+        # submission order
+        pending = deque()
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append(
+                pool.submit(generate_chunk, engine, chunk, players)
+            )
+
+        while pending:
+            results = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(
+                    pool.submit(generate_chunk, engine, chunk, players)
+                )
+
+            for ids in results:
+                if count is not None and yielded >= count:
+                    return
+                slices = slices_from_ids(ids, tiles_by_id)
+                if seen is not None and not seen.add(slices):
+                    continue
+                yielded += 1
+                yield slices
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from itertools import combinations, permutations
+import random
+import threading
+
+from .geometry import get_layout
+
+# A slice is laid out on the "slice" hex layout: slot 0 in the centre and
+# slots 1 to 6 around it. Its tiles go to the first POSITIONS, the other
+# slots stay empty.
+LAYOUT = get_layout("slice")
+SLOTS = len(LAYOUT)
+CENTER = 0
+POSITIONS = (0, 1, 3, 5, 6)
+MAX_PATTERNS = 1024
+
+NEIGHBOURS = tuple(frozenset(neighbours) for neighbours in LAYOUT.neighbours)
+
+
+def _adjacent_pairs(size: int) -> tuple[tuple[int, int], ...]:
+    # Adjacent pairs of occupied slots, as indices into POSITIONS
+    return tuple(
+        (i, j)
+        for i, j in combinations(range(size), 2)
+        if LAYOUT.is_adjacent(POSITIONS[i], POSITIONS[j])
+    )
+
+
+# By number of tiles in the slice
+ADJACENT_PAIRS_BY_SIZE = {
+    size: _adjacent_pairs(size) for size in range(1, len(POSITIONS) + 1)
+}
+ADJACENT_PAIRS = ADJACENT_PAIRS_BY_SIZE[len(POSITIONS)]
+CENTER_INDEX = POSITIONS.index(CENTER)
+
+
+def is_anomaly(tile) -> bool:
+    return any(
+        not anomaly.startswith('Wormhole') for anomaly in tile.anomalies or []
+    )
+
+
+def tile_pattern(tile) -> tuple[str, bool, bool]:
+    # All the placement rules look at
+    return (tile.color, is_anomaly(tile), bool(tile.wormholes))
+
+
+def pair_costs(patterns: tuple) -> list[list[tuple[int, int]]]:
+    # Cost of two tiles being adjacent: broken rules, then red clusters
+    costs = [[(0, 0)] * len(patterns) for _ in patterns]
+    for a, b in combinations(range(len(patterns)), 2):
+        (color_a, anomaly_a, wormhole_a) = patterns[a]
+        (color_b, anomaly_b, wormhole_b) = patterns[b]
+        violations = int(anomaly_a and anomaly_b) \
+            + int(wormhole_a and wormhole_b)
+        clusters = int(color_a == 'red' and color_b == 'red')
+        costs[a][b] = costs[b][a] = (violations, clusters)
+    return costs
+
+
+def best_placements(patterns: tuple) -> list[tuple[int, ...]]:
+    # Orders with the lowest cost, order[i] being the index of the tile in
+    # POSITIONS[i]. Lower is better: broken rules first, then clusters of
+    # red tiles.
+    costs = pair_costs(patterns)
+    adjacent_pairs = ADJACENT_PAIRS_BY_SIZE[len(patterns)]
+
+    best, placements = None, []
+    for order in permutations(range(len(patterns))):
+        violations = int(patterns[order[CENTER_INDEX]][1])
+        clusters = 0
+        for i, j in adjacent_pairs:
+            pair_violations, pair_clusters = costs[order[i]][order[j]]
+            violations += pair_violations
+            clusters += pair_clusters
+
+        cost = (violations, clusters)
+        if best is None or cost < best:
+            best, placements = cost, [order]
+        elif cost == best:
+            placements.append(order)
+    return placements
+
+
+class PlacementCache:
+    # Best placements by slice pattern, least recently used evicted first
+    def __init__(self, maxsize: int = MAX_PATTERNS):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._placements = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._placements)
+
+    def get(self, patterns: tuple) -> list[tuple[int, ...]]:
+        with self._lock:
+            placements = self._placements.get(patterns)
+            if placements is not None:
+                self.hits += 1
+                self._placements.move_to_end(patterns)
+                return placements
+            self.misses += 1
+
+        placements = best_placements(patterns)
+        with self._lock:
+            self._placements[patterns] = placements
+            if len(self._placements) > self.maxsize:
+                self._placements.popitem(last=False)
+        return placements
+
+    def clear(self):
+        with self._lock:
+            self._placements.clear()
+            self.hits = self.misses = 0
+
+
+CACHE = PlacementCache()
+
+
+def place_tiles(tiles: list, rng: random.Random = None) -> list:
+    # Returns the SLOTS slots of the slice, None where there is no tile.
+    # Tiles sharing a pattern are interchangeable, so sorting them by
+    # pattern lets every slice with the same composition share placements.
+    tiles = sorted(tiles, key=tile_pattern)
+    patterns = tuple(tile_pattern(tile) for tile in tiles)
+    order = (rng or random).choice(CACHE.get(patterns))
+
+    result = [None] * SLOTS
+    for position, idx in zip(POSITIONS, order):
+        result[position] = tiles[idx]
+    return result
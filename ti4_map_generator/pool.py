@@ -0,0 +1,164 @@
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+import json
+import os
+import pathlib
+import threading
+import time
+
+from . import logging
+from .catalog import get_catalog
+from .map_generation import Slice, iter_seeds, prepare_slices
+from .parallel import generate_chunk, init_worker, slices_from_ids
+
+LOG = logging.get_logger(__name__)
+
+POOL_SIZE = 256
+LOW_WATER = 64
+CHUNK_SIZE = 16
+# Wait before trying again when no chunk of a refill could be generated
+RETRY_DELAY = 1.0
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    refilled: int = 0
+    refill_seconds: float = 0
+    failed_chunks: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0
+
+    @property
+    def refill_throughput(self) -> float:
+        # Slice sets generated per second of refilling
+        if not self.refill_seconds:
+            return 0
+        return self.refilled / self.refill_seconds
+
+
+class SlicePool:
+    def __init__(self, size: int = POOL_SIZE, low_water: int = LOW_WATER,
+                 engine: str = 'rebalance', seed: int = None,
+                 executor: Executor = None, workers: int = None,
+                 path: pathlib.Path = None):
+        self.size = size
+        self.low_water = low_water
+        self.engine = engine
+        self.path = path
+        self.executor = executor or ProcessPoolExecutor(
+            workers or os.cpu_count(), initializer=init_worker
+        )
+        self.stats = PoolStats()
+        self.tiles = get_catalog().tiles
+        self.tiles_by_id = {t.id_: t for t in self.tiles}
+
+        # Slice sets are kept as tile ids, like the workers return them
+        self._sets = deque()
+        self._seeds = iter_seeds(seed)
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._sets)
+
+    def start(self):
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    self._sets.append(
+                        tuple(tuple(slice_) for slice_ in json.loads(line))
+                    )
+            LOG.debug("Loaded %d slice sets from %s", len(self), self.path)
+
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join()
+        self.executor.shutdown()
+
+        if self.path:
+            with open(self.path, "w") as f:
+                for ids in self._sets:
+                    f.write(json.dumps(ids) + "\n")
+
+    def get(self) -> list[Slice]:
+        with self._condition:
+            if not self._sets:
+                self.stats.misses += 1
+                seed = next(self._seeds)
+                ids = None
+            else:
+                self.stats.hits += 1
+                ids = self._sets.popleft()
+            if len(self._sets) < self.low_water:
+                self._condition.notify_all()
+
+        if ids is None:
+            # Nothing ready, generate it right away rather than behind the
+            # refill work
+            return prepare_slices(
+                engine=self.engine, tiles=self.tiles, seed=seed
+            )
+        return slices_from_ids(ids, self.tiles_by_id)
+
+    def wait_full(self, timeout: float = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._sets) >= self.size, timeout
+            )
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or len(self._sets) < self.low_water
+                )
+                if self._stopped:
+                    return
+                missing = self.size - len(self._sets)
+                chunks = [
+                    [next(self._seeds)
+                     for _ in range(min(CHUNK_SIZE, missing - start))]
+                    for start in range(0, missing, CHUNK_SIZE)
+                ]
+
+            start = time.perf_counter()
+            futures = [
+                self.executor.submit(generate_chunk, self.engine, chunk)
+                for chunk in chunks
+            ]
+            failed = 0
+            for future in futures:
+                try:
+                    results = future.result()
+                except Exception:
+                    # Losing the thread would leave every later request to
+                    # get(), so the chunk is dropped and refilling goes on
+                    LOG.exception("Could not generate a chunk of slice sets")
+                    failed += 1
+                    continue
+                with self._condition:
+                    self._sets.extend(results)
+                    self.stats.refilled += len(results)
+                    self._condition.notify_all()
+            self.stats.refill_seconds += time.perf_counter() - start
+            self.stats.failed_chunks += failed
+            LOG.debug("Refilled slice pool to %d sets", len(self))
+
+            if failed == len(futures):
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._stopped, RETRY_DELAY
+                    )
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+import random
+
+import numpy as np
+
+from . import logging
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import (
+    RebalanceError,
+    RebalanceReport,
+    Slice,
+    Tile,
+    WORMHOLE_TYPES,
+    draw_all_tiles,
+)
+
+LOG = logging.get_logger(__name__)
+
+BATCH_SIZE = 1024
+MAX_BATCHES = 100
+
+
+class TileArrays:
+    def __init__(self, tiles: list[Tile]):
+        self.tiles = tiles
+        self.index = {tile.id_: idx for idx, tile in enumerate(tiles)}
+
+        # An extra zero row at the end, so an index of -1 is an empty slot
+        self.resources = np.array([t.resources for t in tiles] + [0], float)
+        self.influence = np.array([t.influence for t in tiles] + [0], float)
+        self.absolute_value = np.array(
+            [t.absolute_value for t in tiles] + [0], float
+        )
+        self.technology = np.array(
+            [len(t.technology) for t in tiles] + [0], int
+        )
+        self.wormholes = np.array(
+            [[t.wormholes.count(w) for w in WORMHOLE_TYPES] for t in tiles]
+            + [[0] * len(WORMHOLE_TYPES)],
+            int,
+        )
+
+    def partitions(self, slice_sets: list[list[Slice]]) -> np.ndarray:
+        # Tile index matrix of shape (sets, slices, tiles per slice)
+        width = max(len(s.tiles) for slices in slice_sets for s in slices)
+        matrix = np.full(
+            (len(slice_sets), len(slice_sets[0]), width), -1, int
+        )
+        for i, slices in enumerate(slice_sets):
+            for j, slice_ in enumerate(slices):
+                for k, tile in enumerate(slice_.filter_tiles()):
+                    matrix[i, j, k] = self.index[tile.id_]
+        return matrix
+
+
+@dataclass
+class BatchScores:
+    # Per slice aggregates, of shape (sets, slices)
+    resources: np.ndarray
+    influence: np.ndarray
+    absolute_value: np.ndarray
+    technology: np.ndarray
+    # Wormholes per type, of shape (sets, slices, len(WORMHOLE_TYPES))
+    wormholes: np.ndarray
+    # Verdict of check_slice_balance, of shape (sets,)
+    balanced: np.ndarray
+
+
+def score_partitions(arrays: TileArrays,
+                     partitions: np.ndarray) -> BatchScores:
+    resources = arrays.resources[partitions].sum(axis=2)
+    influence = arrays.influence[partitions].sum(axis=2)
+    absolute_value = arrays.absolute_value[partitions].sum(axis=2)
+
+    # Same checks as check_slice_balance()
+    unbalanced_slices = (resources >= 2 * influence) \
+        | (influence >= 2 * resources)
+    balanced = (
+        absolute_value.max(axis=1) < 1.5 * absolute_value.min(axis=1)
+    ) & ~unbalanced_slices.any(axis=1)
+
+    return BatchScores(
+        resources=resources,
+        influence=influence,
+        absolute_value=absolute_value,
+        technology=arrays.technology[partitions].sum(axis=2),
+        wormholes=arrays.wormholes[partitions].sum(axis=2),
+        balanced=balanced,
+    )
+
+
+def score_slice_sets(tiles: list[Tile],
+                     slice_sets: list[list[Slice]]) -> BatchScores:
+    arrays = TileArrays(tiles)
+    return score_partitions(arrays, arrays.partitions(slice_sets))
+
+
+def random_partitions(arrays: TileArrays, count: int,
+                      rng: np.random.Generator, k: int = 6) -> np.ndarray:
+    # Same composition as generate_slices(), as long as the tiles are drawn
+    # for k players
+    red = np.array([i for i, t in enumerate(arrays.tiles) if t.color == 'red'])
+    blue = np.array(
+        [i for i, t in enumerate(arrays.tiles) if t.color == 'blue']
+    )
+    reds = rng.permuted(np.tile(red, (count, 1)), axis=1)
+    blues = rng.permuted(np.tile(blue, (count, 1)), axis=1)
+    return np.concatenate(
+        (reds.reshape(count, k, -1), blues.reshape(count, k, -1)), axis=2
+    )
+
+
+def sample_slices(
+    tiles: list[Tile],
+    players: int = 6,
+    batch_size: int = BATCH_SIZE,
+    max_batches: int = MAX_BATCHES,
+    rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], RebalanceReport]:
+    rng = rng or random
+    with instrumentation.stage("draw_all_tiles"):
+        drawn = draw_all_tiles(list(tiles), players, rng=rng)
+    arrays = TileArrays(drawn)
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    report = RebalanceReport()
+
+    for _ in range(max_batches):
+        with instrumentation.stage("sampling"):
+            partitions = random_partitions(
+                arrays, batch_size, np_rng, k=players
+            )
+            balanced = np.flatnonzero(
+                score_partitions(arrays, partitions).balanced
+            )
+        if balanced.size:
+            report.iterations += int(balanced[0]) + 1
+            LOG.debug("Sampled a balanced partition in %d tries",
+                      report.iterations)
+            return [
+                Slice([drawn[idx] for idx in row])
+                for row in partitions[balanced[0]]
+            ], report
+        report.iterations += batch_size
+
+    raise RebalanceError(
+        f"No balanced partition among {report.iterations} samples"
+    )
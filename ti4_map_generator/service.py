@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import json
+import os
+import random
+from urllib.parse import parse_qs, urlsplit
+
+from . import logging
+from .catalog import get_catalog
+from .map_generation import ENGINES, PLAYER_COUNTS, Slice, iter_seeds
+from .parallel import generate_chunk, init_worker, slices_from_ids
+
+LOG = logging.get_logger(__name__)
+
+HOST = "127.0.0.1"
+PORT = 8080
+# Requests waiting for a worker beyond this are answered with a 503
+MAX_PENDING = 64
+# Sets generated before giving up on stricter thresholds
+MAX_ATTEMPTS = 20
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def value_ratio(slices: list[Slice]) -> float:
+    return max(slices).absolute_value / min(slices).absolute_value
+
+
+def parse_params(query: str) -> dict:
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    try:
+        parsed = {
+            "seed": int(params["seed"]) if "seed" in params else None,
+            "players": int(params.get("players", 6)),
+            "engine": params.get("engine", "rebalance"),
+            "max_ratio": float(params.get("max_ratio", 1.5)),
+        }
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+    if parsed["engine"] not in ENGINES:
+        raise BadRequest(f"Unknown engine: {parsed['engine']}")
+    if parsed["players"] not in PLAYER_COUNTS:
+        raise BadRequest(
+            f"Players must be between {PLAYER_COUNTS[0]} and "
+            f"{PLAYER_COUNTS[-1]}"
+        )
+    return parsed
+
+
+class SliceService:
+    def __init__(self, executor: Executor = None, workers: int = None,
+                 max_pending: int = MAX_PENDING):
+        self.executor = executor or ProcessPoolExecutor(
+            workers or os.cpu_count(), initializer=init_worker
+        )
+        self.tiles_by_id = {t.id_: t for t in get_catalog().tiles}
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def generate(self, seed: int = None, players: int = 6,
+                       engine: str = "rebalance",
+                       max_ratio: float = 1.5) -> dict:
+        # Engines always meet the default thresholds, stricter ones are
+        # reached by trying the next seeds derived from the request seed
+        loop = asyncio.get_running_loop()
+        if seed is None:
+            seed = random.getrandbits(63)
+
+        for set_seed in iter_seeds(seed, MAX_ATTEMPTS):
+            ids, = await loop.run_in_executor(
+                self.executor, generate_chunk, engine, [set_seed], players
+            )
+            slices = slices_from_ids(ids, self.tiles_by_id)
+            if value_ratio(slices) <= max_ratio:
+                return {
+                    "seed": seed,
+                    "slices": [slice_.to_dict() for slice_ in slices],
+                }
+        return None
+
+    async def handle(self, method: str, target: str) -> tuple[int, dict]:
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok", "pending": self.pending}
+        if url.path != "/slices":
+            return 404, {"error": "Not found"}
+        if method != "GET":
+            return 405, {"error": "Only GET is supported"}
+
+        try:
+            params = parse_params(url.query)
+        except BadRequest as e:
+            return 400, {"error": str(e)}
+
+        if self.pending >= self.max_pending:
+            return 503, {"error": "Too many pending requests"}
+        self.pending += 1
+        try:
+            result = await self.generate(**params)
+        finally:
+            self.pending -= 1
+
+        if result is None:
+            return 422, {"error": "Thresholds could not be met"}
+        return 200, result
+
+    async def serve_client(self, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1")
+            # Headers are not used, but must be read
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            try:
+                method, target, _ = request_line.split()
+            except ValueError:
+                status, body = 400, {"error": "Malformed request"}
+            else:
+                status, body = await self.handle(method, target)
+        except Exception:
+            LOG.exception("Failed to handle request")
+            status, body = 500, {"error": "Internal error"}
+
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def start(self, host: str = HOST, port: int = PORT):
+        return await asyncio.start_server(self.serve_client, host, port)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(host: str = HOST, port: int = PORT, workers: int = None):
+    service = SliceService(workers=workers)
+    server = await service.start(host, port)
+    LOG.info("Serving slices on http://%s:%d/slices", host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve slices over HTTP")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
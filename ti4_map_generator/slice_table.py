@@ -0,0 +1,221 @@
+from array import array
+import bisect
+from itertools import combinations
+import random
+
+from . import logging
+from .bitmask import (
+    ABSOLUTE_VALUE,
+    INFLUENCE,
+    RESOURCES,
+    TECHNOLOGY,
+    WORMHOLES,
+    BitmaskCatalog,
+)
+from .instrumentation import NULL_INSTRUMENTATION
+from .map_generation import (
+    WORMHOLE_TYPES,
+    RebalanceError,
+    RebalanceReport,
+    Slice,
+    Tile,
+    draw_all_tiles,
+    slice_composition,
+)
+
+LOG = logging.get_logger(__name__)
+
+# Half widths of the value band around the average slice, tried in order
+BAND_WIDTHS = (0.5, 1, 1.5, 2, 2.5, 3, 4)
+# Options tried per slice, except for the last two slices
+BRANCHING = 3
+MAX_NODES = 5000
+MAX_BANDS = 64
+
+
+class SliceTable:
+    # Every legal slice (blue and red tiles in the given numbers) of a
+    # catalog, sorted by value
+    def __init__(self, tiles: list[Tile], blue: int = 3, red: int = 2):
+        self.blue, self.red = blue, red
+        self.catalog = BitmaskCatalog(tiles)
+        red = [i for i, t in enumerate(self.catalog.tiles) if t.color == 'red']
+        blue = [
+            i for i, t in enumerate(self.catalog.tiles) if t.color == 'blue'
+        ]
+
+        slices = []
+        for reds in combinations(red, self.red):
+            for blues in combinations(blue, self.blue):
+                mask = 0
+                for idx in reds + blues:
+                    mask |= 1 << idx
+                slices.append((self.catalog.aggregates(mask), mask))
+        slices.sort(key=lambda s: s[0][ABSOLUTE_VALUE])
+
+        self.masks = array('Q', (mask for _, mask in slices))
+        self.absolute_value = array(
+            'd', (a[ABSOLUTE_VALUE] for a, _ in slices)
+        )
+        self.resources = array('d', (a[RESOURCES] for a, _ in slices))
+        self.influence = array('d', (a[INFLUENCE] for a, _ in slices))
+        self.technology = array('B', (a[TECHNOLOGY] for a, _ in slices))
+        self.wormholes = {
+            wormhole: array('B', (a[WORMHOLES + i] for a, _ in slices))
+            for i, wormhole in enumerate(WORMHOLE_TYPES)
+        }
+        self.red_mask = sum(1 << idx for idx in red)
+        self.blue_mask = sum(1 << idx for idx in blue)
+        self._valid = {}
+        # Tile bits, most valuable tile first
+        self.order = [
+            1 << idx for idx, _ in sorted(
+                enumerate(self.catalog.tiles),
+                key=lambda t: t[1].absolute_value, reverse=True,
+            )
+        ]
+
+    def __len__(self):
+        return len(self.masks)
+
+    def band(self, low: float, high: float) -> range:
+        # Indices of the slices worth between low and high, inclusive
+        return range(
+            bisect.bisect_left(self.absolute_value, low),
+            bisect.bisect_right(self.absolute_value, high),
+        )
+
+    def is_balanced(self, idx: int) -> bool:
+        resources, influence = self.resources[idx], self.influence[idx]
+        return resources < 2 * influence and influence < 2 * resources
+
+    def valid_slices(self, low: float, high: float) -> dict[int, float]:
+        # Balanced slices worth between low and high, by mask
+        key = (low, high)
+        if key not in self._valid:
+            if len(self._valid) >= MAX_BANDS:
+                self._valid.clear()
+            self._valid[key] = {
+                self.masks[idx]: self.absolute_value[idx]
+                for idx in self.band(low, high) if self.is_balanced(idx)
+            }
+        return self._valid[key]
+
+    def select(self, drawn: list[Tile], rng: random.Random = None,
+               k: int = 6, max_nodes: int = MAX_NODES):
+        # Returns k disjoint slices covering the drawn tiles, with their
+        # values in the narrowest possible band, or None
+        rng = rng or random
+        drawn_mask = 0
+        for tile in drawn:
+            drawn_mask |= 1 << self.catalog.index[tile.id_]
+        total = sum(t.absolute_value for t in drawn)
+        nodes = 0
+
+        for width in BAND_WIDTHS:
+            low, high = total / k - width, total / k + width
+            if high >= 1.5 * low:
+                break
+
+            masks, explored = self._cover(
+                drawn_mask, total, k, self.valid_slices(low, high),
+                low, high, rng, max_nodes - nodes,
+            )
+            nodes += explored
+            if masks:
+                return self.catalog.decode(masks), nodes
+            if nodes >= max_nodes:
+                break
+
+        return None, nodes
+
+    def _options(self, remaining: int, valid: dict[int, float]):
+        # Valid slices made of the most valuable tile left and enough other
+        # blue and red tiles, all still unassigned. The most valuable tile is
+        # always blue.
+        anchor = next(bit for bit in self.order if bit & remaining)
+        blues = [b for b in self._bits(remaining & self.blue_mask)
+                 if b != anchor]
+        reds = list(self._bits(remaining & self.red_mask))
+        red_sets = [sum(bits) for bits in combinations(reds, self.red)]
+        for other_blues in combinations(blues, self.blue - 1):
+            blue_mask = anchor | sum(other_blues)
+            for red_set in red_sets:
+                mask = blue_mask | red_set
+                if mask in valid:
+                    yield mask, valid[mask]
+
+    def _cover(self, remaining: int, total: float, k: int,
+               valid: dict[int, float], low: float, high: float, rng,
+               budget: int):
+        # Depth first search for k slices covering the remaining tiles. Only
+        # a few random options are tried per slice until the last two, which
+        # keeps the search from sinking into dead subtrees.
+        nodes = 0
+        stack = [(remaining, total, ())]
+        while stack and nodes < budget:
+            remaining, total, chosen = stack.pop()
+            if not remaining:
+                return chosen, nodes
+            nodes += 1
+
+            left = k - len(chosen) - 1
+            options = [
+                mask for mask, value in self._options(remaining, valid)
+                # The other slices must still fit in the band on average
+                if left * low <= total - value <= left * high
+            ]
+            rng.shuffle(options)
+            if left > 1:
+                options = options[:BRANCHING]
+            for mask in options:
+                stack.append((
+                    remaining ^ mask,
+                    total - valid[mask],
+                    chosen + (mask,),
+                ))
+
+        return None, nodes
+
+    def _bits(self, mask: int):
+        while mask:
+            bit = mask & -mask
+            yield bit
+            mask ^= bit
+
+
+_tables: dict[tuple, SliceTable] = {}
+
+
+def get_slice_table(tiles: list[Tile], blue: int = 3,
+                    red: int = 2) -> SliceTable:
+    # Built once per catalog content and slice composition
+    key = (blue, red) + tuple(
+        (t.id_, t.color, t.resources, t.influence, t.absolute_value,
+         t.technology, t.wormholes)
+        for t in tiles
+    )
+    if key not in _tables:
+        LOG.debug("Enumerating every legal slice of %d tiles", len(tiles))
+        _tables[key] = SliceTable(tiles, blue, red)
+    return _tables[key]
+
+
+def table_slices(
+    tiles: list[Tile],
+    players: int = 6,
+    rng: random.Random = None,
+    instrumentation=NULL_INSTRUMENTATION,
+) -> tuple[list[Slice], RebalanceReport]:
+    with instrumentation.stage("slice_table"):
+        table = get_slice_table(tiles, *slice_composition(players))
+    with instrumentation.stage("draw_all_tiles"):
+        drawn = draw_all_tiles(list(tiles), players, rng=rng)
+    with instrumentation.stage("select_slices"):
+        slices, nodes = table.select(drawn, rng=rng, k=players)
+
+    if slices is None:
+        raise RebalanceError(
+            f"No balanced slices found in the table after {nodes} nodes"
+        )
+    return slices, RebalanceReport(iterations=nodes)
@@ -0,0 +1,96 @@
+from functools import lru_cache
+import heapq
+import math
+
+from .geometry import HexLayout
+
+# What a hex does to ships moving through it, the most restrictive last
+OPEN, RIFT, BLOCKING, IMPASSABLE = range(4)
+TERRAIN = {
+    # Ships cannot move into a supernova
+    'Supernova': IMPASSABLE,
+    # Ships can move into these, but not through them
+    'Nebula': BLOCKING,
+    'Asteroid Field': BLOCKING,
+    # Ships leaving a gravity rift get an extra move, but may be destroyed
+    'Gravity Rift': RIFT,
+}
+MOVE_COST = 1
+# Cost of a move out of a gravity rift: the extra move makes it free, plus
+# a penalty for the risk
+RIFT_EXIT_COST = 0.5
+# Systems further away are not counted in the value of a home system
+MAX_TRAVEL_COST = 3
+MAX_TERRAINS = 4096
+
+
+def tile_terrain(tile) -> tuple[int, str]:
+    # Movement rule and wormholes of a tile, home systems and empty hexes
+    # being open
+    if tile is None:
+        return (OPEN, "")
+    rule = OPEN
+    for anomaly in tile.anomalies or []:
+        rule = max(rule, TERRAIN.get(anomaly, OPEN))
+    return (rule, tile.wormholes)
+
+
+@lru_cache(maxsize=MAX_TERRAINS)
+def travel_costs(layout: HexLayout, terrain: tuple,
+                 source: int) -> tuple[float, ...]:
+    # Cheapest cost of moving from source to every hex of the layout,
+    # infinite when out of reach. Only depends on the movement rules of
+    # each hex, so maps sharing them share the result.
+    links = {}
+    for idx, (_, wormholes) in enumerate(terrain):
+        for wormhole in wormholes:
+            links.setdefault(wormhole, []).append(idx)
+
+    costs = [math.inf] * len(layout)
+    costs[source] = 0
+    queue = [(0, source)]
+    while queue:
+        cost, idx = heapq.heappop(queue)
+        if cost > costs[idx]:
+            continue
+        rule, wormholes = terrain[idx]
+        if rule == BLOCKING and idx != source:
+            continue
+
+        step = RIFT_EXIT_COST if rule == RIFT else MOVE_COST
+        targets = list(layout.neighbours[idx])
+        for wormhole in wormholes:
+            # Systems with the same wormhole are adjacent
+            targets += links[wormhole]
+        for target in targets:
+            if target == idx or terrain[target][0] == IMPASSABLE:
+                continue
+            if cost + step < costs[target]:
+                costs[target] = cost + step
+                heapq.heappush(queue, (cost + step, target))
+    return tuple(costs)
+
+
+def travel_weight(cost: float) -> float:
+    # Share of a system's value a home system gets at that cost. An
+    # unobstructed path counts as much as plain distance does in
+    # galaxy.DISTANCE_WEIGHTS.
+    if cost > MAX_TRAVEL_COST:
+        return 0
+    return 2 ** (1 - max(cost, MOVE_COST))
+
+
+def travel_values(tiles: list, layout: HexLayout,
+                  homes: tuple[int, ...]) -> list[float]:
+    # Value of the systems each home system can reach, the cheapest to
+    # reach counting the most
+    terrain = tuple(tile_terrain(tile) for tile in tiles)
+    values = []
+    for home in homes:
+        costs = travel_costs(layout, terrain, home)
+        values.append(sum(
+            tile.absolute_value * travel_weight(cost)
+            for tile, cost in zip(tiles, costs)
+            if tile is not None and cost
+        ))
+    return values